@@ -1,5 +1,6 @@
 from logging.config import fileConfig
 from app.database.models import Base
+from config.settings import settings
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
@@ -14,6 +15,9 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Migrate the database the application uses, through the sync driver.
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("+asyncpg", ""))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -0,0 +1,186 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+Tables as the application created them with metadata.create_all before
+migrations were introduced. Every statement is IF NOT EXISTS, so databases
+that were bootstrapped by create_all upgrade through this revision unchanged.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "brokers",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "securities",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("symbol", sa.String(length=20), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.Column("description", sa.String(length=255), nullable=True),
+        sa.Column("type", sa.String(length=50), nullable=True),
+        sa.Column("currency", sa.String(length=50), nullable=True),
+        sa.Column("status", sa.String(length=50), nullable=True),
+        sa.Column("exchange", sa.String(length=50), nullable=True),
+        sa.Column("option_details", sa.String(length=255), nullable=True),
+        sa.Column("order_subtypes", sa.String(length=255), nullable=True),
+        sa.Column("trade_eligible", sa.Boolean(), nullable=True),
+        sa.Column("options_eligible", sa.Boolean(), nullable=True),
+        sa.Column("buyable", sa.Boolean(), nullable=True),
+        sa.Column("sellable", sa.Boolean(), nullable=True),
+        sa.Column("active_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_synced", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("symbol"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("role", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        op.f("ix_users_id"), "users", ["id"], unique=False, if_not_exists=True
+    )
+    op.create_index(
+        op.f("ix_users_email"), "users", ["email"], unique=True, if_not_exists=True
+    )
+    op.create_table(
+        "accounts",
+        sa.Column("account_number", sa.String(length=20), nullable=False),
+        sa.Column("type", sa.String(length=20), nullable=False),
+        sa.Column("current_balance", sa.DECIMAL(precision=20, scale=2), nullable=True),
+        sa.Column("net_deposits", sa.DECIMAL(precision=20, scale=2), nullable=True),
+        sa.Column("currency", sa.String(length=10), nullable=True),
+        sa.Column("status", sa.String(length=10), nullable=False),
+        sa.Column("is_primary", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_synced", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("linked_account_id", sa.String(length=20), nullable=True),
+        sa.Column("account_broker_id", sa.String(length=200), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["account_broker_id"],
+            ["brokers.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["linked_account_id"],
+            ["accounts.account_number"],
+        ),
+        sa.PrimaryKeyConstraint("account_number"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "account_positions",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("quantity", sa.DECIMAL(precision=20, scale=2), nullable=True),
+        sa.Column("amount", sa.DECIMAL(precision=20, scale=2), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("security_id", sa.String(), nullable=True),
+        sa.Column("account_id", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["account_id"],
+            ["accounts.account_number"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["security_id"],
+            ["securities.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "activities",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("currency", sa.String(length=30), nullable=True),
+        sa.Column("type", sa.String(length=30), nullable=False),
+        sa.Column("sub_type", sa.String(length=30), nullable=True),
+        sa.Column("action", sa.String(length=30), nullable=True),
+        sa.Column("stop_price", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column("price", sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column("quantity", sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column("amount", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column("commission", sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column("option_multiplier", sa.String(length=255), nullable=True),
+        sa.Column("symbol", sa.String(length=255), nullable=True),
+        sa.Column("market_currency", sa.String(length=20), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.Column("cancelled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rejected_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("submitted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("filled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_updated", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_synced", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("security_id", sa.String(length=255), nullable=True),
+        sa.Column("account_id", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["account_id"],
+            ["accounts.account_number"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["security_id"],
+            ["securities.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "deposits",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("bank_account_id", sa.String(length=255), nullable=True),
+        sa.Column("status", sa.String(length=255), nullable=True),
+        sa.Column("currency", sa.String(length=30), nullable=True),
+        sa.Column("amount", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column("cancelled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rejected_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("accepted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_synced", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("account_id", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["account_id"],
+            ["accounts.account_number"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("deposits")
+    op.drop_table("activities")
+    op.drop_table("account_positions")
+    op.drop_table("accounts")
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.drop_index(op.f("ix_users_id"), table_name="users")
+    op.drop_table("users")
+    op.drop_table("securities")
+    op.drop_table("brokers")
@@ -0,0 +1,154 @@
+"""sync state, backfill and financials tables; query indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:30:00.000000
+
+Indexes are built with CREATE INDEX CONCURRENTLY so that activities stay
+writable while they build. CONCURRENTLY cannot run inside a transaction, so
+those statements run in an autocommit block; a failed concurrent build
+leaves an INVALID index behind, which has to be dropped before re-running.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_COLUMNS = (
+    ("accounts", "last_activity_synced_at", "TIMESTAMP WITH TIME ZONE"),
+    ("securities", "underlying_symbol", "VARCHAR(20)"),
+    ("securities", "option_expiry", "DATE"),
+    ("securities", "option_strike", "NUMERIC(20, 4)"),
+    ("securities", "option_right", "VARCHAR(4)"),
+)
+
+# (name, table, columns, partial index predicate)
+INDEXES = (
+    # Keyset listing and export: ORDER BY filled_at, id.
+    ("ix_activities_filled_at_id", "activities", ["filled_at", "id"], None),
+    # Account filters with a date range; latest filled_at per account.
+    (
+        "ix_activities_account_filled_at",
+        "activities",
+        ["account_id", "filled_at"],
+        None,
+    ),
+    # Dividend and trade aggregates: type, then accounts, then dates.
+    (
+        "ix_activities_type_account_filled_at",
+        "activities",
+        ["type", "account_id", "filled_at"],
+        None,
+    ),
+    ("ix_activities_symbol_filled_at", "activities", ["symbol", "filled_at"], None),
+    (
+        "ix_activities_security_filled_at",
+        "activities",
+        ["security_id", "filled_at"],
+        None,
+    ),
+    (
+        "ix_activities_account_fees",
+        "activities",
+        ["account_id", "filled_at"],
+        "commission < 0",
+    ),
+    # Broker join in get_accounts_by_broker_name.
+    ("ix_accounts_account_broker_id", "accounts", ["account_broker_id"], None),
+    (
+        "ix_securities_underlying_expiry",
+        "securities",
+        ["underlying_symbol", "option_expiry"],
+        None,
+    ),
+    ("ix_securities_option_expiry", "securities", ["option_expiry"], None),
+    ("ix_backfill_jobs_status", "backfill_jobs", ["status"], None),
+    (
+        "ix_backfill_checkpoints_job_status",
+        "backfill_checkpoints",
+        ["job_id", "status"],
+        None,
+    ),
+)
+
+
+def upgrade() -> None:
+    for table, column, type_ in NEW_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {type_}")
+
+    op.create_table(
+        "backfill_jobs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("broker", sa.String(length=20), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("full", sa.Boolean(), nullable=True),
+        sa.Column("end_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "backfill_checkpoints",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("job_id", sa.String(), nullable=False),
+        sa.Column("account_id", sa.String(length=20), nullable=False),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("window_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("activity_count", sa.Integer(), nullable=True),
+        sa.Column("newest_settled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["account_id"], ["accounts.account_number"]),
+        sa.ForeignKeyConstraint(["job_id"], ["backfill_jobs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "daily_financials",
+        sa.Column("account_id", sa.String(length=20), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("net_value", sa.DECIMAL(precision=20, scale=2), nullable=False),
+        sa.Column("net_deposits", sa.DECIMAL(precision=20, scale=2), nullable=True),
+        sa.ForeignKeyConstraint(["account_id"], ["accounts.account_number"]),
+        sa.PrimaryKeyConstraint("account_id", "currency", "date"),
+        if_not_exists=True,
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    op.drop_table("daily_financials")
+    op.drop_table("backfill_checkpoints")
+    op.drop_table("backfill_jobs")
+    for table, column, _ in reversed(NEW_COLUMNS):
+        op.drop_column(table, column)
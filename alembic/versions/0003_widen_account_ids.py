@@ -0,0 +1,48 @@
+"""widen account ids to fit Wealthsimple account ids
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00.000000
+
+Wealthsimple account ids (e.g. "non-registered-crypto-...") are stored as
+account numbers and do not fit VARCHAR(20). Widening a VARCHAR does not
+rewrite the table in Postgres, so this is a catalog-only change.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACCOUNT_ID_COLUMNS = (
+    ("accounts", "account_number"),
+    ("accounts", "linked_account_id"),
+    ("backfill_checkpoints", "account_id"),
+    ("daily_financials", "account_id"),
+)
+
+
+def upgrade() -> None:
+    for table, column in ACCOUNT_ID_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(length=255),
+            existing_type=sa.String(length=20),
+        )
+
+
+def downgrade() -> None:
+    for table, column in reversed(ACCOUNT_ID_COLUMNS):
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(length=20),
+            existing_type=sa.String(length=255),
+        )
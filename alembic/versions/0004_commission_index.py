@@ -0,0 +1,52 @@
+"""index every activity with a commission, whatever its sign
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:00:00.000000
+
+Questrade stores commissions as negative amounts and Wealthsimple fees are
+stored positive, so commission totals filter on commission <> 0 and the
+partial ix_activities_account_fees index has to use the same predicate. The
+replacement is built concurrently under a temporary name before the old index
+is dropped, so commission queries keep an index throughout.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_activities_account_fees"
+
+
+def _replace_index(where: str) -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            f"{INDEX}_new",
+            "activities",
+            ["account_id", "filled_at"],
+            postgresql_concurrently=True,
+            postgresql_where=sa.text(where),
+            if_not_exists=True,
+        )
+        op.drop_index(
+            INDEX,
+            table_name="activities",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.execute(f"ALTER INDEX {INDEX}_new RENAME TO {INDEX}")
+
+
+def upgrade() -> None:
+    _replace_index("commission <> 0")
+
+
+def downgrade() -> None:
+    _replace_index("commission < 0")
@@ -0,0 +1,71 @@
+"""fill the option columns of securities stored before 0002
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 16:30:00.000000
+
+0002 added underlying_symbol, option_expiry, option_strike and option_right,
+but only securities inserted since carry them: save_securities leaves stored
+rows alone and syncs skip known ids. This parses the symbols of the existing
+securities with the same parser the syncs use. Symbols that are not options
+keep NULLs, so re-running only revisits those.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.option_symbols import option_columns
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+securities = sa.table(
+    "securities",
+    sa.column("id", sa.String),
+    sa.column("symbol", sa.String),
+    sa.column("underlying_symbol", sa.String),
+    sa.column("option_expiry", sa.Date),
+    sa.column("option_strike", sa.DECIMAL(20, 4)),
+    sa.column("option_right", sa.String),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(securities.c.id, securities.c.symbol).where(
+            securities.c.underlying_symbol.is_(None),
+            securities.c.symbol.is_not(None),
+        )
+    ).all()
+
+    updates = []
+    for security_id, symbol in rows:
+        columns = option_columns(symbol)
+        if columns["underlying_symbol"] is not None:
+            updates.append({"security_id": security_id, **columns})
+
+    stmt = (
+        securities.update()
+        .where(securities.c.id == sa.bindparam("security_id"))
+        .values(
+            underlying_symbol=sa.bindparam("underlying_symbol"),
+            option_expiry=sa.bindparam("option_expiry"),
+            option_strike=sa.bindparam("option_strike"),
+            option_right=sa.bindparam("option_right"),
+        )
+    )
+    for start in range(0, len(updates), BATCH_SIZE):
+        bind.execute(stmt, updates[start : start + BATCH_SIZE])
+
+
+def downgrade() -> None:
+    # Data only: the columns themselves go with 0002.
+    pass
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Optional
+
+import httpx
+
+from app.errors import InvalidRefreshTokenError, QuestradeUnauthorizedError
+from app.utils.utils import generate_expiry_timestamp
+from config.settings import settings
+
+TOKEN_URL = "https://login.questrade.com/oauth2/token"
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide AsyncClient so every Questrade call reuses pooled connections."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.QUESTRADE_HTTP_TIMEOUT,
+                connect=settings.QUESTRADE_HTTP_CONNECT_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.QUESTRADE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.QUESTRADE_HTTP_MAX_KEEPALIVE,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class QuestradeClient:
+    """Async adapter over the Questrade REST API.
+
+    `access_token` is the token payload Questrade returns (access_token,
+    token_type, api_server, refresh_token, expires_in) plus our `expires_at`.
+    When a `token_provider` is given, the current token is taken from it before
+    every request instead.
+    """
+
+    def __init__(
+        self,
+        access_token: dict = None,
+        http_client: httpx.AsyncClient = None,
+        token_provider=None,
+    ):
+        self.access_token = access_token
+        self.token_provider = token_provider
+        self._http = http_client or get_http_client()
+
+    @classmethod
+    async def from_refresh_token(cls, refresh_token: str) -> "QuestradeClient":
+        client = cls(access_token={"refresh_token": refresh_token})
+        await client.refresh_access_token()
+        return client
+
+    async def refresh_access_token(self) -> dict:
+        response = await self._http.get(
+            TOKEN_URL,
+            params={
+                "grant_type": "refresh_token",
+                "refresh_token": self.access_token["refresh_token"],
+            },
+        )
+        if response.status_code in (400, 401):
+            raise InvalidRefreshTokenError()
+        response.raise_for_status()
+
+        token = response.json()
+        token["api_server"] = token["api_server"].replace("\\", "").rstrip("/")
+        token["expires_at"] = generate_expiry_timestamp(token["expires_in"])
+        self.access_token = token
+        return token
+
+    async def _get(self, endpoint: str, params: dict = None) -> dict:
+        if self.token_provider is not None:
+            self.access_token = await self.token_provider.get_token()
+        url = f"{self.access_token['api_server']}/v1/{endpoint}"
+        headers = {
+            "Authorization": f"{self.access_token['token_type']} "
+            f"{self.access_token['access_token']}"
+        }
+        response = await self._http.get(url, params=params, headers=headers)
+        if response.status_code == 401:
+            raise QuestradeUnauthorizedError()
+        response.raise_for_status()
+        return response.json()
+
+    async def get_accounts(self) -> list:
+        response = await self._get("accounts")
+        return response["accounts"]
+
+    async def get_account_activities(
+        self, account_id: str, start_date: datetime, end_date: datetime
+    ) -> list:
+        response = await self._get(
+            f"accounts/{account_id}/activities",
+            params={
+                "startTime": start_date.isoformat(),
+                "endTime": end_date.isoformat(),
+            },
+        )
+        return response["activities"]
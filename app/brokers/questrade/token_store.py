@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from filelock import FileLock
+from redis.exceptions import RedisError
+
+from app.utils.redis import async_redis_client
+from app.utils.utils import open_file, yaml_file_exists
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Replace the stored token only if it still carries the refresh token the
+# caller refreshed from (or nothing is stored yet).
+_COMPARE_AND_SWAP_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (not current and ARGV[1] == '') or
+   (current and cjson.decode(current)['refresh_token'] == ARGV[1]) then
+    redis.call('SET', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+def _refresh_token_of(token: Optional[dict]) -> str:
+    return (token or {}).get("refresh_token") or ""
+
+
+class RedisTokenStore:
+    """Questrade token shared by every worker through Redis."""
+
+    def __init__(self, key: str, lock_timeout: int):
+        self.key = key
+        self.lock_timeout = lock_timeout
+        self._compare_and_swap = async_redis_client.register_script(
+            _COMPARE_AND_SWAP_SCRIPT
+        )
+
+    async def read(self) -> Optional[dict]:
+        value = await async_redis_client.get(self.key)
+        return json.loads(value) if value else None
+
+    async def compare_and_swap(self, expected: Optional[dict], token: dict) -> bool:
+        swapped = await self._compare_and_swap(
+            keys=[self.key], args=[_refresh_token_of(expected), json.dumps(token)]
+        )
+        return bool(swapped)
+
+    @asynccontextmanager
+    async def lock(self):
+        async with async_redis_client.lock(
+            f"{self.key}:lock",
+            timeout=self.lock_timeout,
+            blocking_timeout=self.lock_timeout,
+        ):
+            yield
+
+
+class FileTokenStore:
+    """Questrade token kept in the YAML file, guarded by an OS-level file lock."""
+
+    def __init__(self, yaml_path: Path, lock_timeout: int):
+        self.yaml_path = Path(yaml_path)
+        self.lock_timeout = lock_timeout
+        # Not thread-local: it is acquired in a worker thread and released on
+        # the event loop thread.
+        self._file_lock = FileLock(f"{self.yaml_path}.lock", thread_local=False)
+        # FileLock is reentrant within a process, so it only excludes other
+        # processes; coroutines in this one queue on the asyncio lock.
+        self._local_lock = asyncio.Lock()
+
+    async def read(self) -> Optional[dict]:
+        if not yaml_file_exists(self.yaml_path):
+            return None
+        return open_file(self.yaml_path)
+
+    async def compare_and_swap(self, expected: Optional[dict], token: dict) -> bool:
+        current = await self.read()
+        if _refresh_token_of(current) != _refresh_token_of(expected):
+            return False
+        fd, tmp_path = tempfile.mkstemp(dir=self.yaml_path.parent, suffix=".yaml")
+        with os.fdopen(fd, "w") as file:
+            yaml.dump(token, file)
+        os.replace(tmp_path, self.yaml_path)
+        return True
+
+    @asynccontextmanager
+    async def lock(self):
+        async with self._local_lock:
+            await asyncio.to_thread(self._file_lock.acquire, timeout=self.lock_timeout)
+            try:
+                yield
+            finally:
+                self._file_lock.release()
+
+
+async def resolve_token_store(yaml_path: Path):
+    """Redis store when configured and reachable, otherwise the locked YAML file.
+
+    The first worker to use an empty Redis store seeds it from the YAML file so
+    switching backends does not force a new access code.
+    """
+    file_store = FileTokenStore(yaml_path, settings.QUESTRADE_TOKEN_LOCK_TIMEOUT)
+    if settings.QUESTRADE_TOKEN_STORE != "redis":
+        return file_store
+
+    try:
+        redis_store = RedisTokenStore(
+            settings.QUESTRADE_TOKEN_REDIS_KEY, settings.QUESTRADE_TOKEN_LOCK_TIMEOUT
+        )
+        if await redis_store.read() is None:
+            seed = await file_store.read()
+            if seed:
+                await redis_store.compare_and_swap(None, seed)
+        return redis_store
+    except RedisError as e:
+        logger.warning(f"Redis token store unavailable, using file lock: {e}")
+        return file_store
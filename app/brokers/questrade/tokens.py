@@ -0,0 +1,131 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.brokers.questrade.client import QuestradeClient
+from app.brokers.questrade.token_store import resolve_token_store
+from app.errors import InvalidRefreshTokenError
+from config.settings import settings
+
+TOKEN_YAML_PATH = (Path(__file__).parent.parent / "questrade.yaml").resolve()
+
+
+class QuestradeTokenHolder:
+    """In-process view of the Questrade token kept in the shared token store.
+
+    The token is served from memory and re-read from the store at most every
+    `cache_seconds`, so refreshes made by other workers are picked up quickly.
+    Refreshes happen shortly before `expires_at` or after a 401, behind an
+    asyncio lock (one refresh per process) and the store's lock (one refresh
+    across workers). Questrade refresh tokens are single-use, so the new token
+    is written with a compare-and-swap against the one it was refreshed from.
+
+    A missing or rejected refresh token raises InvalidRefreshTokenError; a new
+    one from the Questrade API hub is supplied through `set_refresh_token`.
+    """
+
+    def __init__(
+        self, yaml_path: Path, refresh_buffer_seconds: int, cache_seconds: int
+    ):
+        self.yaml_path = yaml_path
+        self.refresh_buffer_seconds = refresh_buffer_seconds
+        self.cache_seconds = cache_seconds
+        self._store = None
+        self._token: Optional[dict] = None
+        self._read_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self, token: Optional[dict]) -> bool:
+        if not token:
+            return False
+        expires_at = token.get("expires_at", 0)
+        return int(time.time()) + self.refresh_buffer_seconds < expires_at
+
+    def _is_cached(self) -> bool:
+        return (
+            self._is_fresh(self._token)
+            and time.monotonic() - self._read_at < self.cache_seconds
+        )
+
+    def _remember(self, token: Optional[dict]) -> Optional[dict]:
+        self._token = token
+        self._read_at = time.monotonic()
+        return token
+
+    async def _get_store(self):
+        if self._store is None:
+            self._store = await resolve_token_store(self.yaml_path)
+        return self._store
+
+    async def _refresh_locked(
+        self, stale_token: Optional[dict], force: bool = False
+    ) -> dict:
+        store = await self._get_store()
+        async with store.lock():
+            current = await store.read()
+            replaced = stale_token is None or _access_token_of(
+                current
+            ) != _access_token_of(stale_token)
+            if not force and replaced and self._is_fresh(current):
+                return self._remember(current)
+
+            if not (current and current.get("refresh_token")):
+                raise InvalidRefreshTokenError()
+            token = await QuestradeClient(
+                access_token=dict(current)
+            ).refresh_access_token()
+            return self._remember(await self._swap(store, current, token))
+
+    async def _swap(self, store, current: Optional[dict], token: dict) -> dict:
+        if not await store.compare_and_swap(current, token):
+            # Another worker wrote a token despite the lock; theirs wins.
+            return await store.read()
+        return token
+
+    async def get_token(self) -> dict:
+        if self._is_cached():
+            return self._token
+
+        async with self._lock:
+            if self._is_cached():
+                return self._token
+            store = await self._get_store()
+            token = self._remember(await store.read())
+            if self._is_fresh(token):
+                return token
+            return await self._refresh_locked(stale_token=token)
+
+    async def refresh(self, stale_token: Optional[dict] = None) -> dict:
+        """Refresh after a rejected token, or unconditionally when none is given.
+
+        If the store already holds a different, fresh token (another caller or
+        worker refreshed first) that token is adopted instead.
+        """
+        async with self._lock:
+            return await self._refresh_locked(
+                stale_token=stale_token, force=stale_token is None
+            )
+
+    async def set_refresh_token(self, refresh_token: str) -> dict:
+        """Start over from a refresh token generated in the Questrade API hub,
+        once the stored one has been spent or revoked."""
+        async with self._lock:
+            store = await self._get_store()
+            async with store.lock():
+                current = await store.read()
+                client = await QuestradeClient.from_refresh_token(refresh_token)
+                return self._remember(
+                    await self._swap(store, current, client.access_token)
+                )
+
+
+def _access_token_of(token: Optional[dict]) -> Optional[str]:
+    return (token or {}).get("access_token")
+
+
+questrade_tokens = QuestradeTokenHolder(
+    TOKEN_YAML_PATH,
+    settings.QUESTRADE_TOKEN_REFRESH_BUFFER_SECONDS,
+    settings.QUESTRADE_TOKEN_CACHE_SECONDS,
+)
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from ws_api import WealthsimpleAPI
+
+
+def token_expires_at(access_token: Optional[str], default_ttl: int) -> float:
+    """Expiry (epoch seconds) of a Wealthsimple access token.
+
+    Uses the JWT `exp` claim when the token carries one, otherwise assumes the
+    token is good for `default_ttl` seconds from now.
+    """
+    if access_token:
+        try:
+            exp = jwt.get_unverified_claims(access_token).get("exp")
+            if exp:
+                return float(exp)
+        except JWTError:
+            pass
+    return time.time() + default_ttl
+
+
+class WealthsimpleClientPool:
+    """Bounded LRU pool of live WealthsimpleAPI clients keyed by username.
+
+    A client is reused until `expiry_buffer` seconds before its access token
+    expires. Building a client may refresh the token, and Wealthsimple refresh
+    tokens are single-use, so concurrent misses for the same user wait on one
+    build instead of racing. Called from worker threads, hence the locks.
+    """
+
+    def __init__(self, max_size: int, default_ttl: int, expiry_buffer: int):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.expiry_buffer = expiry_buffer
+        self._clients: "OrderedDict[str, Tuple[WealthsimpleAPI, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # username -> [build lock, callers holding or waiting on it]
+        self._user_locks: Dict[str, List] = {}
+
+    def _get_live(self, username: str) -> Optional[WealthsimpleAPI]:
+        with self._lock:
+            entry = self._clients.get(username)
+            if entry is None:
+                return None
+            api, expires_at = entry
+            if time.time() + self.expiry_buffer >= expires_at:
+                del self._clients[username]
+                return None
+            self._clients.move_to_end(username)
+            return api
+
+    @contextmanager
+    def _user_lock(self, username: str) -> Iterator[None]:
+        """Hold the build lock of `username`. The lock only exists while some
+        caller holds or waits on it, so the dict does not grow with every user
+        ever seen."""
+        with self._lock:
+            entry = self._user_locks.setdefault(username, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._user_locks[username]
+
+    def get(
+        self, username: str, build: Callable[[], WealthsimpleAPI]
+    ) -> WealthsimpleAPI:
+        api = self._get_live(username)
+        if api is not None:
+            return api
+
+        with self._user_lock(username):
+            api = self._get_live(username)
+            if api is not None:
+                return api
+
+            api = build()
+            expires_at = token_expires_at(api.session.access_token, self.default_ttl)
+            with self._lock:
+                self._clients[username] = (api, expires_at)
+                self._clients.move_to_end(username)
+                while len(self._clients) > self.max_size:
+                    self._clients.popitem(last=False)
+            return api
+
+    def invalidate(self, username: str) -> None:
+        with self._lock:
+            self._clients.pop(username, None)
@@ -0,0 +1,71 @@
+import asyncio
+import weakref
+from datetime import datetime, timedelta
+from typing import Optional
+
+from loguru import logger
+
+from app.errors import InvalidRefreshTokenError
+from config.settings import settings
+
+
+class WealthsimpleTokenRefresher:
+    """Refreshes the TokensBox of every live wealthsimpleAPI client in the
+    background, before the access token gets close to expiring.
+
+    Clients register themselves once they hold tokens and are tracked weakly,
+    so a discarded client simply drops out. The refresh itself is single-flight
+    per client (see `wealthsimpleAPI.refresh_tokens_if_due`), so a background
+    refresh and a request-path fallback never both spend the refresh token.
+    """
+
+    def __init__(self, refresh_buffer: timedelta, interval_seconds: float):
+        self.refresh_buffer = refresh_buffer
+        self.interval_seconds = interval_seconds
+        self._clients = weakref.WeakSet()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, client) -> None:
+        self._clients.add(client)
+
+    def unregister(self, client) -> None:
+        self._clients.discard(client)
+
+    def is_due(self, client) -> bool:
+        box = getattr(client, "box", None)
+        return box is not None and (
+            box.access_expires - datetime.now() < self.refresh_buffer
+        )
+
+    async def refresh_due_clients(self) -> None:
+        for client in list(self._clients):
+            if not self.is_due(client):
+                continue
+            try:
+                await asyncio.to_thread(client.refresh_tokens_if_due)
+            except InvalidRefreshTokenError:
+                logger.warning("Wealthsimple refresh token rejected; dropping client")
+                self.unregister(client)
+            except Exception as e:
+                logger.error(f"Background Wealthsimple token refresh failed: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh_due_clients()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+wealthsimple_token_refresher = WealthsimpleTokenRefresher(
+    refresh_buffer=timedelta(minutes=settings.WSIMPLE_TOKEN_REFRESH_BUFFER_MINUTES),
+    interval_seconds=settings.WSIMPLE_TOKEN_REFRESH_INTERVAL_SECONDS,
+)
@@ -1,11 +1,12 @@
-import cloudscraper
+import threading
 from datetime import datetime, timedelta
 from loguru import logger
 from typing import Optional, Union
 from urllib.error import HTTPError
 
 from .tokens import TokensBox
-from .wsimple_requestor import requestor
+from .token_refresher import wealthsimple_token_refresher
+from .wsimple_requestor import create_transport, decode_json, requestor
 from app.errors import InvalidRefreshTokenError, LoginError, WSOTPError
 from .endpoints import Endpoints
 
@@ -35,7 +36,9 @@ class wealthsimpleAPI:
         self.internally_manage_tokens = internally_manage_tokens
         self.two_factor_callback = two_factor_callback
         self.logger = logger
-        self.session = self.session = cloudscraper.create_scraper()
+        self.session = create_transport()
+        self.box = None
+        self._refresh_lock = threading.Lock()
 
         if self.oauth_mode:
             print("Mode: Oauth (Bypass)")
@@ -130,16 +133,18 @@ class wealthsimpleAPI:
                 #! natural code login\
                 if final_request.status_code == 200:
                     if self.internally_manage_tokens:
-                        self.session.headers["Authorization"] = (
-                            f"Bearer {final_request.headers['X-Access-Token']}"
-                        )
-                        self.box = TokensBox(
-                            final_request.headers["X-Access-Token"],
-                            final_request.headers["X-Refresh-Token"],
-                            datetime.fromtimestamp(
-                                int(final_request.headers["X-Access-Token-Expires"])
-                            ),
+                        self._apply_tokens(
+                            TokensBox(
+                                final_request.headers["X-Access-Token"],
+                                final_request.headers["X-Refresh-Token"],
+                                datetime.fromtimestamp(
+                                    int(
+                                        final_request.headers["X-Access-Token-Expires"]
+                                    )
+                                ),
+                            )
                         )
+                        wealthsimple_token_refresher.register(self)
 
                         return self
                     else:
@@ -177,6 +182,7 @@ class wealthsimpleAPI:
         r = requestor(
             Endpoints.REFRESH,
             args={"base": self.BASE_URL},
+            session=self.session,
             data=tokens[1],
             login_refresh=True,
             logger=self.logger,
@@ -200,20 +206,33 @@ class wealthsimpleAPI:
                 ]
                 return self.tokens
 
+    def _apply_tokens(self, box: TokensBox) -> None:
+        self.box = box
+        self.session.headers["Authorization"] = f"Bearer {box.access_token}"
+
+    def refresh_tokens_if_due(self, buffer: Optional[timedelta] = None) -> bool:
+        """Single-flight refresh of the managed tokens.
+
+        Whoever takes the lock first refreshes; callers that were waiting see
+        the new expiry and return without spending the refresh token again.
+        A zero `buffer` refreshes only once the access token has expired.
+        """
+        if buffer is None:
+            buffer = wealthsimple_token_refresher.refresh_buffer
+        with self._refresh_lock:
+            if self.box.access_expires - datetime.now() >= buffer:
+                return False
+            self._apply_tokens(self.refresh_token(tokens=self.box.tokens))
+            return True
+
     def _manage_tokens(f):
         def wrap_manage_tokens(self, *args, **kwargs):
-            print(f"Tokens: {self.box} {args} {kwargs}")
-            if self.internally_manage_tokens:
-                diff = self.box.access_expires - datetime.now()
-                print(f"Reset in -> {diff}")
-                if diff < timedelta(minutes=15):
-                    print("Resetting Tokens")
-                    self.box = self.refresh_token(tokens=self.box.tokens)
-                    print("Refreshed Tokens")
-                    print(self.box)
-                return f(self, *args, **kwargs)
-            else:
-                return f(self, *args, **kwargs)
+            # The background refresher keeps tokens fresh; only an access
+            # token that has actually expired (refresher stopped or behind)
+            # is refreshed on the request path.
+            if self.internally_manage_tokens and self.box.is_token_expired():
+                self.refresh_tokens_if_due(buffer=timedelta(0))
+            return f(self, *args, **kwargs)
 
         return wrap_manage_tokens
 
@@ -359,7 +378,7 @@ class wealthsimpleAPI:
             )
             # response = self.TradeAPI.makeRequest("GET", "account/activities", params=callParams)
             response.raise_for_status()
-            response_data = response.json()
+            response_data = decode_json(response.content)
             print("Result Length")
             print(len(response_data["results"]))
             print(response_data)
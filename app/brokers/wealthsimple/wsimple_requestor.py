@@ -1,11 +1,17 @@
 import json
+import random
+import orjson
+import threading
 import cloudscraper as req
-from loguru import logger
+from cloudscraper import CipherSuiteAdapter
+from loguru import logger as default_logger
 from box import Box
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError, Timeout
 
+from config.settings import settings
+
 # errors
 from app.errors import (
     InvalidAccessTokenError,
@@ -15,6 +21,93 @@ from app.errors import (
 )
 
 
+class JitteredRetry(Retry):
+    """Retry whose exponential backoff gets up to `backoff_jitter` seconds of
+    random jitter, so clients retrying together do not retry in lockstep.
+
+    `Retry-After` on 413/429/503 responses still takes precedence over the
+    backoff, as in the base class.
+    """
+
+    def __init__(self, *args, backoff_jitter: float = 0.0, **kwargs):
+        self.backoff_jitter = backoff_jitter
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kw):
+        kw.setdefault("backoff_jitter", self.backoff_jitter)
+        return super().new(**kw)
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff and self.backoff_jitter:
+            backoff += random.uniform(0, self.backoff_jitter)
+        return backoff
+
+
+def create_retry_strategy() -> Retry:
+    return JitteredRetry(
+        total=settings.WSIMPLE_HTTP_RETRIES,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        backoff_factor=settings.WSIMPLE_HTTP_BACKOFF_FACTOR,
+        backoff_jitter=settings.WSIMPLE_HTTP_BACKOFF_JITTER,
+        respect_retry_after_header=True,
+        # Hand the last response back so the status mapping below applies.
+        raise_on_status=False,
+    )
+
+
+def create_transport(retry_strategy: Retry = None):
+    """Cloudscraper session with sized, keep-alive connection pools and retries.
+
+    Meant to be built once and reused, so calls share pooled TLS connections.
+    The HTTPS adapter keeps cloudscraper's SSL context (its cipher suite).
+    """
+    session = req.create_scraper()
+    retry_strategy = retry_strategy or create_retry_strategy()
+    pool_sizes = {
+        "pool_connections": settings.WSIMPLE_HTTP_POOL_CONNECTIONS,
+        "pool_maxsize": settings.WSIMPLE_HTTP_POOL_MAXSIZE,
+        "max_retries": retry_strategy,
+    }
+    https_adapter = session.get_adapter("https://")
+    session.mount(
+        "https://",
+        CipherSuiteAdapter(
+            ssl_context=https_adapter.ssl_context,
+            source_address=https_adapter.source_address,
+            **pool_sizes,
+        ),
+    )
+    session.mount("http://", HTTPAdapter(**pool_sizes))
+    return session
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    """Shared transport for callers that do not bring their own session."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = create_transport()
+        return _default_transport
+
+
+def get_endpoint_timeout(name: str) -> float:
+    return settings.WSIMPLE_REQUEST_TIMEOUTS.get(
+        name, settings.WSIMPLE_REQUEST_TIMEOUTS["default"]
+    )
+
+
+def decode_json(content: bytes, plain: bool = True):
+    """Parse a response body; `plain` skips Box's recursive wrapping."""
+    data = orjson.loads(content)
+    return data if plain else Box(data)
+
+
 def requestor(
     endpoint,
     args,
@@ -24,34 +117,26 @@ def requestor(
     retry_strategy=None,
     session=None,
     login_refresh=False,
+    plain_json=None,
     **kwargs,
 ) -> Box:
+    """Send one Wealthsimple request and decode the JSON body.
+
+    Returns a Box unless `plain_json` (default WSIMPLE_PLAIN_JSON) is set, in
+    which case the body is parsed with orjson into plain dicts and lists.
+    """
+    logger = logger or default_logger
     try:
         if session is None:
-            session = req.create_scraper()
-        if retry_strategy is None:
-            default_retry_strategy = Retry(
-                total=1,  # Number of retries
-                status_forcelist=[429, 500, 502, 503, 504],
-                method_whitelist=[
-                    "HEAD",
-                    "GET",
-                    "POST",
-                    "PUT",
-                    "DELETE",
-                    "OPTIONS",
-                    "TRACE",
-                ],
-                backoff_factor=1,  # Wait between retries
+            session = (
+                create_transport(retry_strategy)
+                if retry_strategy is not None
+                else get_default_transport()
             )
-        adapter = HTTPAdapter(max_retries=default_retry_strategy)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
         name: str = endpoint.name
         url: str = endpoint.value.route.format(**args)
-        print("Requestor Call")
-        print(url)
-        print(kwargs)
+        kwargs.setdefault("timeout", get_endpoint_timeout(name))
+        logger.debug(f"Wealthsimple {endpoint.value.method} {name}: {url}")
         r = session.request(method=endpoint.value[1], url=url, **kwargs)
         if login_refresh:
             return r
@@ -60,10 +145,13 @@ def requestor(
         if r.status_code == 401:
             raise InvalidAccessTokenError
         elif r.status_code == 404:
-            print(f"404 on {r.url}")
+            logger.warning(f"404 on {r.url}")
             raise RouteNotFoundException
         elif r.status_code >= 500:
             raise WealthsimpleServerError
+        elif plain_json or (plain_json is None and settings.WSIMPLE_PLAIN_JSON):
+            data = decode_json(r.content)
+            return data[0] if response_list and not request_status else data
         else:
             if request_status:
                 return Box(json.loads(r.content))
@@ -73,9 +161,9 @@ def requestor(
                 return Box(r.json())
 
     except (ConnectionError, ConnectionResetError) as e:
-        print(f"Connection error occurred: {str(e)}")
+        logger.error(f"Connection error occurred: {str(e)}")
         raise WealthsimpleServerError()
 
     except Timeout as e:
-        print(f"Request timed out: {str(e)}")
+        logger.error(f"Request timed out: {str(e)}")
         raise WealthsimpleServerError()
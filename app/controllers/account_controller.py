@@ -1,48 +1,98 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi import HTTPException, Depends, APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.schemas.schemas import ActivityResponse, AccountResponse
+from app.schemas.activity import ActivityAggregate
+from app.schemas.schemas import AccountResponse
 from app.database.connection import get_db
+from app.dependencies import get_activity_filters
 from app.services.account_service import AccountService
 from app.repositories.account_respository import AccountRepository
-
+from app.repositories.activity_repository import ActivityRepository
 
 router = APIRouter()
 account_service = AccountService(None, AccountRepository())
 
 
-def get_account_service(db=Depends(get_db)) -> AccountService:
-    return AccountService(db)
+def get_account_service() -> AccountService:
+    return AccountService(ActivityRepository(), AccountRepository())
 
 
 @router.get("/dividends/total", response_model=float)
 async def get_account_dividends_total(
+    filters: dict = Depends(get_activity_filters),
+    db: AsyncSession = Depends(get_db),
+    service: AccountService = Depends(get_account_service),
+):
+    try:
+        return await service.get_total_dividends(db, **filters)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/commissions/total", response_model=float)
+async def get_account_commissions_total(
+    filters: dict = Depends(get_activity_filters),
+    db: AsyncSession = Depends(get_db),
+    service: AccountService = Depends(get_account_service),
+):
+    try:
+        return await service.get_total_commissions(db, **filters)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/summary/{kind}", response_model=List[ActivityAggregate])
+async def get_activity_summary(
+    kind: Literal["dividends", "commissions", "trades"],
+    group_by: str = "account,currency,period",
+    period: Literal["day", "week", "month", "quarter", "year"] = "month",
+    filters: dict = Depends(get_activity_filters),
+    db: AsyncSession = Depends(get_db),
     service: AccountService = Depends(get_account_service),
 ):
+    """Totals and counts grouped by any of account, currency and period."""
+    groups = [name for name in group_by.split(",") if name]
+    unknown = set(groups) - {"account", "currency", "period"}
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown group_by: {', '.join(sorted(unknown))}"
+        )
     try:
-        return await service.get_total_dividends()
+        return await service.summarize_activities(
+            db, kind, group_by=groups, period=period, **filters
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/commissions", response_model=list[ActivityResponse])
+@router.get("/commissions", response_model=List[ActivityAggregate])
 async def get_account_commissions(
+    filters: dict = Depends(get_activity_filters),
+    db: AsyncSession = Depends(get_db),
     service: AccountService = Depends(get_account_service),
 ):
     try:
-        return await service.get_commissions()
+        return await service.get_commissions(db, **filters)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{account_id}/trades_count", response_model=int)
 async def get_account_trades_count(
+    account_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
     service: AccountService = Depends(get_account_service),
 ):
     try:
-        return await service.get_trades_count()
+        return await service.get_trades_count(
+            db, account_ids=[account_id], start=start, end=end
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
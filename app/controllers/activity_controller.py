@@ -1,20 +1,109 @@
-from fastapi import APIRouter, Depends
+import zlib
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from app.database.connection import get_db
+from app.database.connection import get_db, sessionLocal
 from app.database.models import Activity
+from app.dependencies import get_activity_filters, split_param
+from app.errors import InvalidCursorError
+from app.repositories.activity_repository import ActivityRepository
 from app.schemas.schemas import ActivityResponse
-
+from app.utils.export import encode_csv, encode_csv_header, encode_ndjson
+from app.utils.pagination import decode_cursor, encode_cursor
+from config.settings import settings
 
 router = APIRouter()
 
 
+def get_activity_columns(fields: Optional[str] = None) -> List[str]:
+    """Comma-separated columns to return; all columns by default."""
+    columns = split_param(fields) or [c.name for c in Activity.__table__.columns]
+    unknown = set(columns) - set(Activity.__table__.columns.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return columns
+
+
 @router.get("/")
-async def get_activities(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Activity))
-    activities = result.scalars().all()
-    return {"activities": activities}
+async def get_activities(
+    filters: dict = Depends(get_activity_filters),
+    columns: List[str] = Depends(get_activity_columns),
+    limit: int = Query(
+        settings.ACTIVITY_PAGE_SIZE, ge=1, le=settings.ACTIVITY_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Activities newest first, one page at a time.
+
+    filled_at and id are always returned. Pass the returned `next_cursor`
+    back as `cursor` for the following page.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    activities = await ActivityRepository.get_page(
+        db, columns, limit, after=after, **filters
+    )
+    next_cursor = (
+        encode_cursor(activities[-1]["filled_at"], activities[-1]["id"])
+        if len(activities) == limit
+        else None
+    )
+    return {"activities": activities, "next_cursor": next_cursor}
+
+
+@router.get("/export")
+async def export_activities(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    filters: dict = Depends(get_activity_filters),
+    columns: List[str] = Depends(get_activity_columns),
+):
+    """Stream every matching activity, oldest first, as NDJSON or CSV.
+
+    Rows come from a server-side cursor in ACTIVITY_EXPORT_BATCH_SIZE batches
+    and are encoded and sent batch by batch, so memory stays flat however
+    many rows match.
+    """
+    encode = encode_ndjson if format == "ndjson" else encode_csv
+
+    async def body():
+        compressor = zlib.compressobj(wbits=31) if gzip else None
+        # Own session: the request's may be closed before the stream ends.
+        async with sessionLocal() as db:
+            if format == "csv":
+                header = encode_csv_header(columns)
+                yield compressor.compress(header) if compressor else header
+            async for rows in ActivityRepository.stream_rows(
+                db, columns, settings.ACTIVITY_EXPORT_BATCH_SIZE, **filters
+            ):
+                chunk = encode(rows, columns)
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+        if compressor:
+            yield compressor.flush()
+
+    filename = f"activities.{format}" + (".gz" if gzip else "")
+    media_type = (
+        "application/gzip"
+        if gzip
+        else ("application/x-ndjson" if format == "ndjson" else "text/csv")
+    )
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.post("/")
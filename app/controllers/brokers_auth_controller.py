@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 import logging
 from ws_api import OTPRequiredException, LoginFailedException
@@ -5,7 +7,12 @@ from ws_api import OTPRequiredException, LoginFailedException
 from app.services.wealthsimple_service import WealthsimpleService
 from app.services.questrade_service import QuestradeService
 from app.dependencies import get_questrade_service, get_wealthsimple_service
-from app.schemas.auth import BrokerLoginRequest, BrokerLoginResponse
+from app.errors import InvalidRefreshTokenError
+from app.schemas.auth import (
+    BrokerLoginRequest,
+    BrokerLoginResponse,
+    QuestradeLoginRequest,
+)
 
 router = APIRouter()
 
@@ -43,10 +50,19 @@ async def refresh_wealthsimple_token(
 
 
 @router.post("/questrade/login")
-async def login_questrade(service: QuestradeService = Depends(get_questrade_service)):
+async def login_questrade(
+    credentials: Optional[QuestradeLoginRequest] = None,
+    service: QuestradeService = Depends(get_questrade_service),
+):
+    """Log in with the stored token, or with a new refresh token generated in
+    the Questrade API hub once the stored one has been spent or revoked."""
     try:
-        await service.authenticate()
+        await service.authenticate(
+            refresh_token=credentials.refresh_token if credentials else None
+        )
         return {"message": "Logged in to Questrade"}
+    except InvalidRefreshTokenError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.questrade_service import QuestradeService
+from app.services.questrade_backfill import questrade_backfill
 from app.dependencies import get_questrade_service
 from app.database.connection import get_db
 
@@ -24,11 +25,12 @@ async def sync_accounts(
 
 @router.get("/sync-activities")
 async def sync_activities(
+    full: bool = False,
     db: AsyncSession = Depends(get_db),
     service: QuestradeService = Depends(get_questrade_service),
 ):
     try:
-        return await service.sync_activities(db)
+        return await service.sync_activities(db, full=full)
     except Exception as e:
         import traceback
 
@@ -36,6 +38,33 @@ async def sync_activities(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/backfill")
+async def start_backfill(
+    full: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    return await questrade_backfill.start(db, full=full)
+
+
+@router.get("/backfill/{job_id}")
+async def get_backfill_progress(job_id: str, db: AsyncSession = Depends(get_db)):
+    progress = await questrade_backfill.get_progress(db, job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return progress
+
+
+@router.post("/backfill/{job_id}/resume")
+async def resume_backfill(job_id: str, db: AsyncSession = Depends(get_db)):
+    progress = await questrade_backfill.get_progress(db, job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    if progress["status"] == "done":
+        return progress
+    questrade_backfill.launch(job_id)
+    return progress
+
+
 @router.post("/sync-all")
 async def sync_all(
     db: AsyncSession = Depends(get_db),
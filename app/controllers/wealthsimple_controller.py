@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from starlette.concurrency import run_in_threadpool
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.services.wealthsimple_service import WealthsimpleService
-from app.dependencies import get_wealthsimple_service
+from app.services.wealthsimple_service import (
+    WealthsimpleService,
+    security_quote_cache,
+    security_search_cache,
+    wealthsimple_executor,
+)
+from app.dependencies import get_account_ids, get_wealthsimple_service, split_param
 from app.database.connection import get_db
 
 router = APIRouter()
@@ -18,7 +26,9 @@ async def ws_login(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        session = await run_in_threadpool(service.login, db, username, password, otp)
+        session = await wealthsimple_executor.run(
+            service.login, db, username, password, otp
+        )
         return {"status": "success"}
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
@@ -30,7 +40,7 @@ async def sync_accounts(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        return await run_in_threadpool(service.get_accounts, db)
+        return await wealthsimple_executor.run(service.get_accounts, db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -43,13 +53,26 @@ async def ws_account_balances(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        return await run_in_threadpool(
+        return await wealthsimple_executor.run(
             service.get_account_balances, db, username, account_id
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/balances/batch")
+async def ws_accounts_balances(
+    username: str,
+    account_ids: List[str] = Depends(get_account_ids),
+    db: Session = Depends(get_db),
+    service: WealthsimpleService = Depends(get_wealthsimple_service),
+):
+    try:
+        return await service.get_accounts_balances(db, username, account_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/activities")
 async def ws_activities(
     username: str,
@@ -59,13 +82,26 @@ async def ws_activities(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        return await run_in_threadpool(
+        return await wealthsimple_executor.run(
             service.get_activities, db, username, account_id, how_many
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/sync-activities")
+async def ws_sync_activities(
+    username: str,
+    full: bool = False,
+    db: AsyncSession = Depends(get_db),
+    service: WealthsimpleService = Depends(get_wealthsimple_service),
+):
+    try:
+        return await service.sync_activities(db, username, full=full)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/historical-financials")
 async def ws_identity_historical_financials(
     username: str,
@@ -75,14 +111,46 @@ async def ws_identity_historical_financials(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        ids = account_ids.split(",") if account_ids else []
-        return await run_in_threadpool(
+        ids = split_param(account_ids) or []
+        return await wealthsimple_executor.run(
             service.get_identity_historical_financials, db, username, ids, currency
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/sync-historical-financials")
+async def ws_sync_historical_financials(
+    username: str,
+    currency: str = "CAD",
+    db: AsyncSession = Depends(get_db),
+    service: WealthsimpleService = Depends(get_wealthsimple_service),
+):
+    try:
+        return await service.sync_historical_financials(db, username, currency)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/financials-series")
+async def ws_financials_series(
+    account_ids: List[str] = Depends(get_account_ids),
+    currency: str = "CAD",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    points: Optional[int] = Query(None, ge=3),
+    period: Optional[Literal["day", "week", "month", "quarter", "year"]] = None,
+    db: AsyncSession = Depends(get_db),
+    service: WealthsimpleService = Depends(get_wealthsimple_service),
+):
+    try:
+        return await service.get_financials_series(
+            db, account_ids, currency, start, end, points, period
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/search-security")
 async def ws_search_security(
     username: str,
@@ -91,7 +159,7 @@ async def ws_search_security(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        return await run_in_threadpool(service.search_security, db, username, query)
+        return await service.cached_search_security(db, username, query)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -104,9 +172,7 @@ async def ws_security_market_data(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        return await run_in_threadpool(
-            service.get_security_market_data, db, username, security_id
-        )
+        return await service.cached_security_market_data(db, username, security_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -120,7 +186,7 @@ async def ws_account_historical_financials(
     service: WealthsimpleService = Depends(get_wealthsimple_service),
 ):
     try:
-        return await run_in_threadpool(
+        return await wealthsimple_executor.run(
             service.get_account_historical_financials,
             db,
             username,
@@ -129,3 +195,32 @@ async def ws_account_historical_financials(
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/account-historical-financials/batch")
+async def ws_accounts_historical_financials(
+    username: str,
+    account_ids: List[str] = Depends(get_account_ids),
+    currency: str = "CAD",
+    db: Session = Depends(get_db),
+    service: WealthsimpleService = Depends(get_wealthsimple_service),
+):
+    try:
+        return await service.get_accounts_historical_financials(
+            db, username, account_ids, currency
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/executor-metrics")
+async def ws_executor_metrics():
+    return wealthsimple_executor.metrics()
+
+
+@router.get("/cache-metrics")
+async def ws_cache_metrics():
+    return {
+        "search": security_search_cache.stats(),
+        "quote": security_quote_cache.stats(),
+    }
@@ -61,6 +61,10 @@ SECURITY_UPDATE_FIELDS = [
     "buyable",
     "sellable",
     "active_date",
+    "underlying_symbol",
+    "option_expiry",
+    "option_strike",
+    "option_right",
     "last_synced",
 ]
 
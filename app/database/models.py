@@ -1,4 +1,15 @@
-from sqlalchemy import Column, String, ForeignKey, Boolean, DECIMAL, DateTime, Integer
+from sqlalchemy import (
+    Column,
+    String,
+    ForeignKey,
+    Boolean,
+    DECIMAL,
+    Date,
+    DateTime,
+    Index,
+    Integer,
+    text,
+)
 from sqlalchemy.orm import relationship
 from app.database.connection import Base
 from datetime import datetime, timezone
@@ -22,7 +33,7 @@ class User(Base):
 class Account(Base):
     __tablename__ = "accounts"
 
-    account_number = Column(String(20), primary_key=True)
+    account_number = Column(String(255), primary_key=True)
     type = Column(String(20), nullable=False)
     current_balance = Column(DECIMAL(20, 2), default=0)
     net_deposits = Column(DECIMAL(20, 2), default=0)
@@ -32,11 +43,14 @@ class Account(Base):
     created_at = Column(DateTime(timezone=True), default=utc_now)
     updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
     last_synced = Column(DateTime(timezone=True), default=utc_now)
+    last_activity_synced_at = Column(DateTime(timezone=True), nullable=True)
 
     linked_account_id = Column(
-        String(20), ForeignKey("accounts.account_number"), nullable=True
+        String(255), ForeignKey("accounts.account_number"), nullable=True
+    )
+    account_broker_id = Column(
+        String(200), ForeignKey("brokers.id"), nullable=False, index=True
     )
-    account_broker_id = Column(String(200), ForeignKey("brokers.id"), nullable=False)
     linked_account = relationship("Account", remote_side=[account_number])
     account_broker = relationship("Broker")
     activities = relationship("Activity", backref="accounts")
@@ -96,6 +110,25 @@ class Activity(Base):
         String(255), ForeignKey("accounts.account_number"), nullable=False
     )
 
+    __table_args__ = (
+        Index("ix_activities_filled_at_id", "filled_at", "id"),
+        Index("ix_activities_account_filled_at", "account_id", "filled_at"),
+        Index(
+            "ix_activities_type_account_filled_at", "type", "account_id", "filled_at"
+        ),
+        Index("ix_activities_symbol_filled_at", "symbol", "filled_at"),
+        Index("ix_activities_security_filled_at", "security_id", "filled_at"),
+        # Only the few rows that carry a fee, stored negative by Questrade and
+        # positive by Wealthsimple; the predicate must appear verbatim in
+        # queries for the planner to use it.
+        Index(
+            "ix_activities_account_fees",
+            "account_id",
+            "filled_at",
+            postgresql_where=text("commission <> 0"),
+        ),
+    )
+
 
 class Position(Base):
     __tablename__ = "account_positions"
@@ -137,6 +170,11 @@ class Security(Base):
     option_details = Column(String(255), nullable=True)
     order_subtypes = Column(String(255), nullable=True)
 
+    underlying_symbol = Column(String(20), nullable=True)
+    option_expiry = Column(Date, nullable=True)
+    option_strike = Column(DECIMAL(20, 4), nullable=True)
+    option_right = Column(String(4), nullable=True)
+
     trade_eligible = Column(Boolean, default=False)
     options_eligible = Column(Boolean, default=False)
     buyable = Column(Boolean, default=False)
@@ -145,3 +183,57 @@ class Security(Base):
     active_date = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), default=utc_now)
     last_synced = Column(DateTime(timezone=True), default=utc_now)
+
+    __table_args__ = (
+        Index("ix_securities_underlying_expiry", "underlying_symbol", "option_expiry"),
+        Index("ix_securities_option_expiry", "option_expiry"),
+    )
+
+
+class BackfillJob(Base):
+    __tablename__ = "backfill_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    broker = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    full = Column(Boolean, default=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=utc_now)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    checkpoints = relationship("BackfillCheckpoint", back_populates="job")
+
+
+class BackfillCheckpoint(Base):
+    __tablename__ = "backfill_checkpoints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("backfill_jobs.id"), nullable=False)
+    account_id = Column(
+        String(255), ForeignKey("accounts.account_number"), nullable=False
+    )
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    activity_count = Column(Integer, default=0)
+    newest_settled_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    job = relationship("BackfillJob", back_populates="checkpoints")
+
+    __table_args__ = (Index("ix_backfill_checkpoints_job_status", "job_id", "status"),)
+
+
+class DailyFinancial(Base):
+    __tablename__ = "daily_financials"
+
+    account_id = Column(
+        String(255), ForeignKey("accounts.account_number"), primary_key=True
+    )
+    currency = Column(String(3), primary_key=True)
+    date = Column(Date, primary_key=True)
+    net_value = Column(DECIMAL(20, 2), nullable=False)
+    net_deposits = Column(DECIMAL(20, 2), nullable=True)
@@ -1,4 +1,7 @@
-from fastapi import Depends
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
@@ -7,6 +10,8 @@ from app.repositories.account_respository import AccountRepository
 from app.repositories.activity_repository import ActivityRepository
 from app.repositories.security_repository import SecurityRepository
 from app.repositories.broker_repository import BrokerRepository
+from app.repositories.backfill_repository import BackfillRepository
+from app.repositories.financials_repository import FinancialsRepository
 from app.services.questrade_service import QuestradeService
 from app.services.wealthsimple_service import WealthsimpleService
 
@@ -15,6 +20,42 @@ def get_logger():
     return logging.getLogger("pytrade_api")
 
 
+def split_param(value: Optional[str]) -> Optional[List[str]]:
+    """Items of a comma-separated query parameter, stripped, without empty or
+    repeated ones."""
+    items = [item.strip() for item in value.split(",")] if value else []
+    return list(dict.fromkeys(item for item in items if item)) or None
+
+
+def get_account_ids(account_ids: str) -> List[str]:
+    """Required comma-separated account ids."""
+    ids = split_param(account_ids)
+    if not ids:
+        raise HTTPException(
+            status_code=422, detail="account_ids must name at least one account"
+        )
+    return ids
+
+
+def get_activity_filters(
+    account_ids: Optional[str] = None,
+    type: Optional[str] = None,
+    symbol: Optional[str] = None,
+    security_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> dict:
+    """`account_ids` and `type` take comma-separated values; dates are [start, end)."""
+    return {
+        "account_ids": split_param(account_ids),
+        "types": split_param(type),
+        "symbol": symbol,
+        "security_id": security_id,
+        "start": start,
+        "end": end,
+    }
+
+
 def get_account_repository(logger=Depends(get_logger)) -> AccountRepository:
     return AccountRepository(logger=logger)
 
@@ -31,16 +72,26 @@ def get_security_repository(logger=Depends(get_logger)) -> SecurityRepository:
     return SecurityRepository(logger=logger)
 
 
+def get_backfill_repository(logger=Depends(get_logger)) -> BackfillRepository:
+    return BackfillRepository(logger=logger)
+
+
+def get_financials_repository(logger=Depends(get_logger)) -> FinancialsRepository:
+    return FinancialsRepository(logger=logger)
+
+
 def get_questrade_service(
     account_repo: AccountRepository = Depends(get_account_repository),
     activity_repo: ActivityRepository = Depends(get_activity_repository),
     security_repo: SecurityRepository = Depends(get_security_repository),
+    backfill_repo: BackfillRepository = Depends(get_backfill_repository),
     logger=Depends(get_logger),
 ) -> QuestradeService:
     return QuestradeService(
         account_repo=account_repo,
         activity_repo=activity_repo,
         security_repo=security_repo,
+        backfill_repo=backfill_repo,
         logger=logger,
     )
 
@@ -49,12 +100,14 @@ def get_wealthsimple_service(
     account_repo: AccountRepository = Depends(get_account_repository),
     activity_repo: ActivityRepository = Depends(get_activity_repository),
     security_repo: SecurityRepository = Depends(get_security_repository),
+    financials_repo: FinancialsRepository = Depends(get_financials_repository),
     logger=Depends(get_logger),
 ) -> WealthsimpleService:
     return WealthsimpleService(
         account_repo=account_repo,
         activity_repo=activity_repo,
         security_repo=security_repo,
+        financials_repo=financials_repo,
         logger=logger,
     )
 
@@ -114,3 +114,21 @@ class WealthsimpleDownException(AppError):
             message.strip(),
             status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+class QuestradeUnauthorizedError(AppError):
+    def __init__(self):
+        super().__init__(
+            "QuestradeUnauthorizedError",
+            "Questrade rejected the access token: 401 Unauthorized",
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+
+class InvalidCursorError(AppError):
+    def __init__(self):
+        super().__init__(
+            "InvalidCursorError",
+            "The pagination cursor is malformed",
+            status.HTTP_400_BAD_REQUEST,
+        )
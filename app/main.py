@@ -3,7 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
 
-from app.database.connection import engine, Base, sessionLocal
+from app.database.connection import engine, sessionLocal
+from app.brokers.questrade.client import close_http_client
+from app.services.questrade_backfill import questrade_backfill
+from app.services.wealthsimple_service import wealthsimple_executor
+from app.brokers.wealthsimple.token_refresher import wealthsimple_token_refresher
 from app.utils.db_seed import seed_brokers
 from app.routes import router
 
@@ -15,14 +19,18 @@ from middlewares import (
 
 
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
     async with sessionLocal() as session:
         await seed_brokers(session)
 
+    await questrade_backfill.resume_pending()
+    wealthsimple_token_refresher.start()
+
     yield
 
+    await wealthsimple_token_refresher.stop()
+    await questrade_backfill.shutdown()
+    await close_http_client()
+    wealthsimple_executor.shutdown()
     await engine.dispose()
 
 
@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import SQLAlchemyError
@@ -8,9 +9,12 @@ from sqlalchemy.orm import selectinload
 
 from app.database.models import Account, Broker
 from app.repositories.broker_repository import BrokerRepository
+from config.settings import settings
 
 
 class AccountRepository:
+    _broker_ids: Dict[str, str] = {}
+
     def __init__(self, logger=None):
         self.logger = logger
 
@@ -47,33 +51,43 @@ class AccountRepository:
                 self.logger.warning("Empty accounts_data provided to save_accounts")
             return []
 
-        fetched_account_broker_id = None
-        if broker:
-            broker_obj = await BrokerRepository.get_broker_by_name(db, broker)
-            if not broker_obj:
-                raise ValueError(f"Broker with name '{broker}' not found")
-            if self.logger:
-                self.logger.info(f"Broker found: {broker_obj.name}")
-            fetched_account_broker_id = broker_obj.id
+        account_broker_id = await self.get_broker_id(db, broker) if broker else None
 
-        account_objs = []
+        now = datetime.now(tz=timezone.utc)
+        rows_by_number = {}
         for acc in accounts_data:
             if not acc.get("number"):
                 raise ValueError("Account number is required")
 
-            account = Account(
-                type=acc.get("type"),
-                account_number=acc.get("number"),
-                status=acc.get("status"),
-                is_primary=acc.get("isPrimary", False),
-                last_synced=datetime.now(tz=timezone.utc),
-                currency=acc.get("currency"),
-                account_broker_id=fetched_account_broker_id,
-            )
-            account_objs.append(account)
+            rows_by_number[acc["number"]] = {
+                "type": acc.get("type"),
+                "account_number": acc.get("number"),
+                "status": acc.get("status"),
+                "is_primary": acc.get("isPrimary", False),
+                "last_synced": now,
+                "updated_at": now,
+                "currency": acc.get("currency"),
+                "account_broker_id": account_broker_id,
+            }
+        rows = list(rows_by_number.values())
+
+        # Only overwrite columns the broker actually sent, so balances and
+        # net deposits computed elsewhere survive a re-sync.
+        stmt = insert(Account).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["account_number"],
+            set_={
+                field: stmt.excluded[field]
+                for field in settings.ACCOUNT_UPDATE_FIELDS
+                if field in rows[0]
+            },
+        ).returning(Account)
 
         try:
-            db.add_all(account_objs)
+            result = await db.execute(
+                stmt, execution_options={"populate_existing": True}
+            )
+            saved_accounts = result.scalars().all()
             await db.commit()
         except SQLAlchemyError as e:
             await db.rollback()
@@ -81,13 +95,23 @@ class AccountRepository:
                 self.logger.error(f"Error saving accounts: {e}")
             raise
 
-        for account in account_objs:
-            await db.refresh(account)
-
         if self.logger:
-            self.logger.info(f"Saved {len(account_objs)} accounts")
+            self.logger.info(f"Saved {len(saved_accounts)} accounts")
+
+        return saved_accounts
 
-        return account_objs
+    async def get_broker_id(self, db: AsyncSession, broker: str) -> str:
+        """Broker id by name, cached for the process since brokers are seeded
+        once and never renamed."""
+        broker_id = self._broker_ids.get(broker)
+        if broker_id is None:
+            broker_obj = await BrokerRepository.get_broker_by_name(db, broker)
+            if not broker_obj:
+                raise ValueError(f"Broker with name '{broker}' not found")
+            if self.logger:
+                self.logger.info(f"Broker found: {broker_obj.name}")
+            broker_id = self._broker_ids[broker] = broker_obj.id
+        return broker_id
 
     async def update_account(
         self, db: AsyncSession, account_id: str, update_data: dict
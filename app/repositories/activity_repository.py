@@ -1,51 +1,174 @@
-from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Sequence, Tuple
 from datetime import datetime, timezone
 from sqlalchemy.dialects.postgresql import insert
 import sqlalchemy as sa
+from sqlalchemy.engine import RowMapping
 
 from app.database.models import Activity
-from app.schemas.activity import ActivityCreate, ActivityUpdate
+from app.schemas.activity import ActivityType
+from app.utils.utils import chunked, rows_per_statement
+from config.settings import settings
+
+# Columns every listing returns, whatever the caller selects: the keyset.
+KEYSET_COLUMNS = ("filled_at", "id")
+
+
+def activity_filters(
+    account_ids: Optional[List[str]] = None,
+    types: Optional[List[str]] = None,
+    symbol: Optional[str] = None,
+    security_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> list:
+    """WHERE conditions for the optional activity filters; dates are [start, end)."""
+    conditions = []
+    if account_ids:
+        conditions.append(Activity.account_id.in_(account_ids))
+    if types:
+        conditions.append(Activity.type.in_(types))
+    if symbol:
+        conditions.append(Activity.symbol == symbol)
+    if security_id:
+        conditions.append(Activity.security_id == security_id)
+    if start is not None:
+        conditions.append(Activity.filled_at >= start)
+    if end is not None:
+        conditions.append(Activity.filled_at < end)
+    return conditions
 
 
 class ActivityRepository:
     def __init__(self, logger=None):
         self.logger = logger
 
-    async def get_all(self) -> List[Activity]:
-        result = await self.session.execute(select(Activity))
-        return result.scalars().all()
+    @staticmethod
+    async def aggregate(
+        db: AsyncSession,
+        value,
+        *conditions,
+        group_by: Sequence[str] = (),
+        period: str = "month",
+        **filters,
+    ) -> List[dict]:
+        """Aggregate `value` over filtered activities in the database.
+
+        `filters` are those of activity_filters. `group_by` takes any of
+        "account", "currency" and "period" (filled_at truncated to `period`,
+        e.g. "month"). Account and date filters match the (account_id,
+        filled_at) and (type, account_id, filled_at) indexes.
+        """
+        group_columns = {
+            "account": Activity.account_id.label("account_id"),
+            "currency": Activity.currency.label("currency"),
+            "period": sa.func.date_trunc(period, Activity.filled_at).label("period"),
+        }
+        groups = [group_columns[name] for name in group_by]
+
+        stmt = sa.select(
+            *groups,
+            value.label("total"),
+            sa.func.count().label("count"),
+        ).where(*conditions, *activity_filters(**filters))
+        if groups:
+            # By output name: a repeated date_trunc would bind its own period
+            # parameter and no longer match the selected expression.
+            names = [sa.literal_column(column.name) for column in groups]
+            stmt = stmt.group_by(*names).order_by(*names)
+
+        result = await db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    async def get_page(
+        db: AsyncSession,
+        columns: Sequence[str],
+        limit: int,
+        after: Optional[Tuple[Optional[datetime], str]] = None,
+        **filters,
+    ) -> List[dict]:
+        """One page of activities, newest first, keyset-paginated on
+        (filled_at, id).
 
-    async def get_by_id(self, activity_id: str) -> Optional[Activity]:
-        result = await self.session.execute(
-            select(Activity).where(Activity.id == activity_id)
+        `after` is the (filled_at, id) of the last row of the previous page.
+        Rows without filled_at sort first, as in a descending index scan.
+        """
+        names = list(dict.fromkeys([*columns, *KEYSET_COLUMNS]))
+        stmt = (
+            sa.select(*(Activity.__table__.c[name] for name in names))
+            .where(*activity_filters(**filters))
+            .order_by(Activity.filled_at.desc(), Activity.id.desc())
+            .limit(limit)
         )
-        return result.scalars().first()
+        if after is not None:
+            filled_at, activity_id = after
+            if filled_at is None:
+                stmt = stmt.where(
+                    sa.or_(
+                        sa.and_(
+                            Activity.filled_at.is_(None), Activity.id < activity_id
+                        ),
+                        Activity.filled_at.is_not(None),
+                    )
+                )
+            else:
+                stmt = stmt.where(
+                    sa.tuple_(Activity.filled_at, Activity.id)
+                    < sa.tuple_(filled_at, activity_id)
+                )
+        result = await db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
 
-    async def find_by_type(self, activity_type: str) -> List[Activity]:
-        result = await self.session.execute(
-            select(Activity).where(Activity.type == activity_type)
+    @staticmethod
+    async def stream_rows(
+        db: AsyncSession, columns: Sequence[str], batch_size: int, **filters
+    ) -> AsyncIterator[List[RowMapping]]:
+        """Matching activities, oldest first, in batches from a server-side
+        cursor, so only one batch is held in memory at a time."""
+        stmt = (
+            sa.select(*(Activity.__table__.c[name] for name in columns))
+            .where(*activity_filters(**filters))
+            .order_by(Activity.filled_at, Activity.id)
+            .execution_options(yield_per=batch_size)
         )
-        return result.scalars().all()
+        result = await db.stream(stmt)
+        async for rows in result.mappings().partitions():
+            yield rows
 
-    async def find_negative_commissions(self) -> List[Activity]:
-        result = await self.session.execute(
-            select(Activity).where(Activity.commission < 0)
+    async def aggregate_dividends(self, db: AsyncSession, **filters) -> List[dict]:
+        return await self.aggregate(
+            db,
+            sa.func.coalesce(sa.func.sum(sa.func.abs(Activity.amount)), 0),
+            Activity.type == ActivityType.DIVIDEND.value,
+            **filters,
         )
-        return result.scalars().all()
 
-    async def save(self, activity: ActivityCreate) -> Activity:
-        db_activity = Activity(**activity.dict())
-        self.session.add(db_activity)
-        await self.session.commit()
-        await self.session.refresh(db_activity)
-        return db_activity
+    async def aggregate_commissions(self, db: AsyncSession, **filters) -> List[dict]:
+        return await self.aggregate(
+            db,
+            sa.func.coalesce(sa.func.sum(sa.func.abs(Activity.commission)), 0),
+            # Questrade stores fees as negative amounts and Wealthsimple as
+            # positive ones. Inlined rather than bound, so that prepared
+            # statements still match the partial ix_activities_account_fees index.
+            Activity.commission != sa.literal_column("0"),
+            **filters,
+        )
+
+    async def aggregate_trades(self, db: AsyncSession, **filters) -> List[dict]:
+        return await self.aggregate(
+            db,
+            sa.func.count(),
+            Activity.type == ActivityType.ORDER.value,
+            **filters,
+        )
 
     async def save_activities(
-        self, db: AsyncSession, activities: list["Activity"]
+        self, db: AsyncSession, activities: list
     ) -> list["Activity"]:
+        """Insert new activities, given as Activity objects or as row dicts
+        with the same keys, and return the stored rows."""
         if not activities:
             return []
 
@@ -53,17 +176,24 @@ class ActivityRepository:
         activity_dicts = []
         activity_ids = []
         for activity in activities:
-            if not hasattr(activity, "last_synced") or activity.last_synced is None:
-                activity.last_synced = now
-            data = activity.__dict__.copy()
-            data.pop("_sa_instance_state", None)
+            if isinstance(activity, dict):
+                data = dict(activity)
+            else:
+                data = activity.__dict__.copy()
+                data.pop("_sa_instance_state", None)
+            if data.get("last_synced") is None:
+                data["last_synced"] = now
             activity_dicts.append(data)
-            activity_ids.append(activity.id)
+            activity_ids.append(data["id"])
 
+        rows_per_insert = rows_per_statement(
+            len(Activity.__table__.columns), settings.DB_MAX_BIND_PARAMS
+        )
         try:
-            stmt = insert(Activity).values(activity_dicts)
-            stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
-            await db.execute(stmt)
+            for chunk in chunked(activity_dicts, rows_per_insert):
+                stmt = insert(Activity).values(chunk)
+                stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
+                await db.execute(stmt)
             await db.commit()
         except SQLAlchemyError as e:
             await db.rollback()
@@ -73,29 +203,15 @@ class ActivityRepository:
             raise  # re-raise so caller knows insert failed
 
         try:
-            result = await db.execute(
-                sa.select(Activity).where(Activity.id.in_(activity_ids))
-            )
-            saved_activities = result.scalars().all()
+            saved_activities = []
+            for ids in chunked(activity_ids, settings.DB_MAX_BIND_PARAMS):
+                result = await db.execute(
+                    sa.select(Activity).where(Activity.id.in_(ids))
+                )
+                saved_activities.extend(result.scalars().all())
         except SQLAlchemyError as e:
             if hasattr(self, "logger") and self.logger:
                 self.logger.error(f"Error querying inserted activities: {e}")
             raise
 
         return saved_activities
-
-    async def update(
-        self, activity_id: str, activity: ActivityUpdate
-    ) -> Optional[Activity]:
-        await self.session.execute(
-            update(Activity)
-            .where(Activity.id == activity_id)
-            .values(**activity.dict(exclude_unset=True))
-        )
-        await self.session.commit()
-        return await self.get(activity_id)
-
-    async def delete(self, activity_id: str) -> bool:
-        await self.session.execute(delete(Activity).where(Activity.id == activity_id))
-        await self.session.commit()
-        return True
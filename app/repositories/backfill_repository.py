@@ -0,0 +1,265 @@
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database.models import BackfillCheckpoint, BackfillJob
+from app.utils.utils import chunked, rows_per_statement
+from config.settings import settings
+
+# Jobs in these states are not being worked on and can be picked up again.
+RESUMABLE_STATUSES = ("queued", "interrupted", "failed")
+
+
+class BackfillRepository:
+    def __init__(self, logger=None):
+        self.logger = logger
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: str) -> Optional[BackfillJob]:
+        result = await db.execute(select(BackfillJob).where(BackfillJob.id == job_id))
+        return result.scalars().first()
+
+    async def create_job(
+        self,
+        db: AsyncSession,
+        broker: str,
+        full: bool,
+        end_time: datetime,
+        windows: Iterable[Tuple[str, datetime, datetime]],
+    ) -> BackfillJob:
+        """Create a job with one pending checkpoint per (account, window)."""
+        job = BackfillJob(broker=broker, full=full, end_time=end_time)
+        try:
+            db.add(job)
+            await db.flush()
+            checkpoints = [
+                {
+                    "job_id": job.id,
+                    "account_id": account_id,
+                    "window_start": window_start,
+                    "window_end": window_end,
+                    "status": "pending",
+                }
+                for account_id, window_start, window_end in windows
+            ]
+            rows_per_insert = rows_per_statement(
+                len(checkpoints[0]) if checkpoints else 1,
+                settings.DB_MAX_BIND_PARAMS,
+            )
+            for chunk in chunked(checkpoints, rows_per_insert):
+                await db.execute(BackfillCheckpoint.__table__.insert(), chunk)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            if self.logger:
+                self.logger.error(f"Error creating backfill job: {e}")
+            raise
+
+        if self.logger:
+            self.logger.info(
+                f"Created backfill job {job.id} with {len(checkpoints)} windows"
+            )
+        return job
+
+    @staticmethod
+    async def claim_job(db: AsyncSession, job_id: str) -> bool:
+        """Atomically mark a job as running unless another worker holds it.
+
+        A running job whose heartbeat (`updated_at`) is older than
+        QUESTRADE_BACKFILL_STALE_SECONDS is treated as abandoned.
+        """
+        stale_before = datetime.now(tz=timezone.utc) - timedelta(
+            seconds=settings.QUESTRADE_BACKFILL_STALE_SECONDS
+        )
+        result = await db.execute(
+            update(BackfillJob)
+            .where(
+                BackfillJob.id == job_id,
+                or_(
+                    BackfillJob.status.in_(RESUMABLE_STATUSES),
+                    (BackfillJob.status == "running")
+                    & (BackfillJob.updated_at < stale_before),
+                ),
+            )
+            .values(status="running", error=None)
+            .returning(BackfillJob.id)
+        )
+        await db.commit()
+        return result.scalar_one_or_none() is not None
+
+    @staticmethod
+    async def touch_job(db: AsyncSession, job_id: str) -> None:
+        """Bump the heartbeat of a running job, so it is not claimed as stale."""
+        await db.execute(
+            update(BackfillJob)
+            .where(BackfillJob.id == job_id, BackfillJob.status == "running")
+            .values(updated_at=datetime.now(tz=timezone.utc))
+        )
+        await db.commit()
+
+    @staticmethod
+    async def get_resumable_job_ids(db: AsyncSession) -> List[str]:
+        stale_before = datetime.now(tz=timezone.utc) - timedelta(
+            seconds=settings.QUESTRADE_BACKFILL_STALE_SECONDS
+        )
+        result = await db.execute(
+            select(BackfillJob.id).where(
+                or_(
+                    BackfillJob.status.in_(("queued", "interrupted")),
+                    (BackfillJob.status == "running")
+                    & (BackfillJob.updated_at < stale_before),
+                )
+            )
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_pending_checkpoints(
+        db: AsyncSession, job_id: str
+    ) -> List[BackfillCheckpoint]:
+        result = await db.execute(
+            select(BackfillCheckpoint)
+            .where(
+                BackfillCheckpoint.job_id == job_id,
+                BackfillCheckpoint.status == "pending",
+            )
+            .order_by(BackfillCheckpoint.account_id, BackfillCheckpoint.window_start)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_account_ids(db: AsyncSession, job_id: str) -> List[str]:
+        result = await db.execute(
+            select(BackfillCheckpoint.account_id)
+            .where(BackfillCheckpoint.job_id == job_id)
+            .distinct()
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def skip_checkpoints(
+        db: AsyncSession, job_id: str, account_ids: Iterable[str]
+    ) -> int:
+        """Mark the pending windows of `account_ids` as skipped."""
+        result = await db.execute(
+            update(BackfillCheckpoint)
+            .where(
+                BackfillCheckpoint.job_id == job_id,
+                BackfillCheckpoint.account_id.in_(list(account_ids)),
+                BackfillCheckpoint.status == "pending",
+            )
+            .values(status="skipped", completed_at=datetime.now(tz=timezone.utc))
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def complete_checkpoint(
+        db: AsyncSession,
+        checkpoint: BackfillCheckpoint,
+        activity_count: int,
+        newest_settled_at: Optional[datetime],
+    ) -> None:
+        """Mark a window done and bump the job's heartbeat in one transaction."""
+        now = datetime.now(tz=timezone.utc)
+        await db.execute(
+            update(BackfillCheckpoint)
+            .where(BackfillCheckpoint.id == checkpoint.id)
+            .values(
+                status="done",
+                activity_count=activity_count,
+                newest_settled_at=newest_settled_at,
+                completed_at=now,
+            )
+        )
+        await db.execute(
+            update(BackfillJob)
+            .where(BackfillJob.id == checkpoint.job_id)
+            .values(updated_at=now)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def get_newest_settled_at(
+        db: AsyncSession, job_id: str, account_id: str
+    ) -> Optional[datetime]:
+        result = await db.execute(
+            select(func.max(BackfillCheckpoint.newest_settled_at)).where(
+                BackfillCheckpoint.job_id == job_id,
+                BackfillCheckpoint.account_id == account_id,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def finish_job(
+        db: AsyncSession, job_id: str, status: str, error: Optional[str] = None
+    ) -> None:
+        values = {"status": status, "error": error}
+        if status == "done":
+            values["finished_at"] = datetime.now(tz=timezone.utc)
+        await db.execute(
+            update(BackfillJob).where(BackfillJob.id == job_id).values(**values)
+        )
+        await db.commit()
+
+    async def get_job_progress(self, db: AsyncSession, job_id: str) -> Optional[dict]:
+        job = await self.get_job(db, job_id)
+        if job is None:
+            return None
+
+        result = await db.execute(
+            select(
+                BackfillCheckpoint.status,
+                func.count(BackfillCheckpoint.id),
+                func.coalesce(func.sum(BackfillCheckpoint.activity_count), 0),
+            )
+            .where(BackfillCheckpoint.job_id == job_id)
+            .group_by(BackfillCheckpoint.status)
+        )
+        windows = {"pending": 0, "done": 0, "skipped": 0}
+        activity_count = 0
+        for status, count, activities in result.all():
+            windows[status] = count
+            activity_count += activities
+
+        last_window = await db.execute(
+            select(BackfillCheckpoint.account_id, BackfillCheckpoint.window_end)
+            .where(
+                BackfillCheckpoint.job_id == job_id,
+                BackfillCheckpoint.status == "done",
+            )
+            .order_by(BackfillCheckpoint.completed_at.desc())
+            .limit(1)
+        )
+        last = last_window.first()
+
+        total = sum(windows.values())
+        return {
+            "job_id": job.id,
+            "broker": job.broker,
+            "status": job.status,
+            "full": job.full,
+            "error": job.error,
+            "windows_total": total,
+            "windows_done": windows["done"],
+            "windows_skipped": windows["skipped"],
+            "percent_complete": (
+                round(100 * (windows["done"] + windows["skipped"]) / total, 1)
+                if total
+                else 100.0
+            ),
+            "activity_count": activity_count,
+            "last_checkpoint": (
+                {"account_id": last.account_id, "window_end": last.window_end}
+                if last
+                else None
+            ),
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+            "finished_at": job.finished_at,
+        }
@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional
+from datetime import date
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database.models import DailyFinancial
+from app.utils.utils import chunked, rows_per_statement
+from config.settings import settings
+
+
+class FinancialsRepository:
+    def __init__(self, logger=None):
+        self.logger = logger
+
+    @staticmethod
+    async def get_latest_dates(
+        db: AsyncSession, account_ids: List[str], currency: str
+    ) -> Dict[str, date]:
+        result = await db.execute(
+            select(DailyFinancial.account_id, func.max(DailyFinancial.date))
+            .where(
+                DailyFinancial.account_id.in_(account_ids),
+                DailyFinancial.currency == currency,
+            )
+            .group_by(DailyFinancial.account_id)
+        )
+        return dict(result.all())
+
+    async def save_points(self, db: AsyncSession, points: List[dict]) -> int:
+        """Upsert daily points; the last stored day is overwritten on re-sync."""
+        if not points:
+            return 0
+        rows_per_insert = rows_per_statement(
+            len(DailyFinancial.__table__.columns), settings.DB_MAX_BIND_PARAMS
+        )
+        try:
+            for chunk in chunked(points, rows_per_insert):
+                stmt = insert(DailyFinancial).values(chunk)
+                await db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["account_id", "currency", "date"],
+                        set_={
+                            "net_value": stmt.excluded.net_value,
+                            "net_deposits": stmt.excluded.net_deposits,
+                        },
+                    )
+                )
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            if self.logger:
+                self.logger.error(f"Error saving daily financials: {e}")
+            raise
+        return len(points)
+
+    @staticmethod
+    async def get_range(
+        db: AsyncSession,
+        account_ids: List[str],
+        currency: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[tuple]:
+        """(date, net_value, net_deposits) rows summed across the accounts."""
+        stmt = (
+            select(
+                DailyFinancial.date,
+                func.sum(DailyFinancial.net_value),
+                func.sum(DailyFinancial.net_deposits),
+            )
+            .where(
+                DailyFinancial.account_id.in_(account_ids),
+                DailyFinancial.currency == currency,
+            )
+            .group_by(DailyFinancial.date)
+            .order_by(DailyFinancial.date)
+        )
+        if start is not None:
+            stmt = stmt.where(DailyFinancial.date >= start)
+        if end is not None:
+            stmt = stmt.where(DailyFinancial.date <= end)
+        result = await db.execute(stmt)
+        return result.all()
@@ -1,5 +1,5 @@
-from typing import List, Optional
-from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+from datetime import date, datetime, timezone
 
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,12 +9,44 @@ from sqlalchemy import update, delete
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.database.models import Security
+from app.utils.utils import chunked, rows_per_statement
+from config.settings import settings
 
 
 class SecurityRepository:
+    # Ids known to exist in the securities table. Securities are only ever
+    # inserted by the syncs, so once seen an id stays valid for the process.
+    _known_ids: Set[str] = set()
+
     def __init__(self, logger=None):
         self.logger = logger
 
+    async def get_known_security_ids(
+        self, db: AsyncSession, security_ids: Iterable[str]
+    ) -> Set[str]:
+        """The subset of `security_ids` already stored, from cache or one query."""
+        security_ids = set(security_ids)
+        known = security_ids & self._known_ids
+        unknown = list(security_ids - known)
+        for ids in chunked(unknown, settings.DB_MAX_BIND_PARAMS):
+            result = await db.execute(select(Security.id).where(Security.id.in_(ids)))
+            found = set(result.scalars().all())
+            self._known_ids.update(found)
+            known |= found
+        return known
+
+    @staticmethod
+    async def get_ids_by_symbols(
+        db: AsyncSession, symbols: Iterable[str]
+    ) -> Dict[str, str]:
+        ids_by_symbol = {}
+        for chunk in chunked(list(set(symbols)), settings.DB_MAX_BIND_PARAMS):
+            result = await db.execute(
+                select(Security.symbol, Security.id).where(Security.symbol.in_(chunk))
+            )
+            ids_by_symbol.update(result.tuples().all())
+        return ids_by_symbol
+
     @staticmethod
     async def get_all_securities(db: AsyncSession) -> List[Security]:
         result = await db.execute(select(Security))
@@ -54,10 +86,14 @@ class SecurityRepository:
             security_dicts.append(data)
             security_ids.append(sec.id)
 
+        rows_per_insert = rows_per_statement(
+            len(Security.__table__.columns), settings.DB_MAX_BIND_PARAMS
+        )
         try:
-            stmt = insert(Security).values(security_dicts)
-            stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
-            await db.execute(stmt)
+            for chunk in chunked(security_dicts, rows_per_insert):
+                stmt = insert(Security).values(chunk)
+                stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
+                await db.execute(stmt)
             await db.commit()
         except SQLAlchemyError as e:
             await db.rollback()
@@ -66,15 +102,19 @@ class SecurityRepository:
             raise
 
         try:
-            result = await db.execute(
-                sa.select(Security).where(Security.id.in_(security_ids))
-            )
-            saved_securities = result.scalars().all()
+            saved_securities = []
+            for ids in chunked(security_ids, settings.DB_MAX_BIND_PARAMS):
+                result = await db.execute(
+                    sa.select(Security).where(Security.id.in_(ids))
+                )
+                saved_securities.extend(result.scalars().all())
         except SQLAlchemyError as e:
             if self.logger:
                 self.logger.error(f"Error querying saved securities: {e}")
             raise
 
+        self._known_ids.update(security.id for security in saved_securities)
+
         if self.logger:
             self.logger.info(f"Saved {len(saved_securities)} securities")
 
@@ -96,6 +136,7 @@ class SecurityRepository:
     async def delete_security(self, db: AsyncSession, security_id: str) -> bool:
         result = await db.execute(delete(Security).where(Security.id == security_id))
         await db.commit()
+        self._known_ids.discard(security_id)
         return result.rowcount > 0
 
     async def get_securities_by_status(
@@ -111,3 +152,20 @@ class SecurityRepository:
             select(Security).filter(Security.type == security_type)
         )
         return result.scalars().all()
+
+    async def get_options_by_underlying(
+        self,
+        db: AsyncSession,
+        underlying_symbol: str,
+        expiry_from: Optional[date] = None,
+        expiry_to: Optional[date] = None,
+    ) -> List[Security]:
+        stmt = select(Security).filter(
+            Security.underlying_symbol == underlying_symbol.upper()
+        )
+        if expiry_from is not None:
+            stmt = stmt.filter(Security.option_expiry >= expiry_from)
+        if expiry_to is not None:
+            stmt = stmt.filter(Security.option_expiry <= expiry_to)
+        result = await db.execute(stmt.order_by(Security.option_expiry))
+        return result.scalars().all()
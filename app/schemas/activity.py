@@ -16,6 +16,14 @@ class TradesCountResponse(BaseModel):
     tradesCount: int
 
 
+class ActivityAggregate(BaseModel):
+    account_id: Optional[str] = None
+    currency: Optional[str] = None
+    period: Optional[datetime] = None
+    total: Decimal
+    count: int
+
+
 class ActivityType(str, Enum):
     CONVERT_FUNDS = "Convert Funds"
     DIVIDEND = "Dividend"
@@ -8,6 +8,10 @@ class BrokerLoginRequest(BaseModel):
     otp: Optional[str] = None
 
 
+class QuestradeLoginRequest(BaseModel):
+    refresh_token: str
+
+
 class TokenData(BaseModel):
     access_token: str
     refresh_token: str
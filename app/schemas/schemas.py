@@ -1,5 +1,5 @@
 from __future__ import annotations
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional, List
 from uuid import UUID
@@ -263,6 +263,10 @@ class SecurityBase(UTCBase):
     buyable: bool = False
     sellable: bool = False
     active_date: Optional[datetime] = None
+    underlying_symbol: Optional[str] = None
+    option_expiry: Optional[date] = None
+    option_strike: Optional[Decimal] = None
+    option_right: Optional[str] = None
 
 
 class SecurityCreate(SecurityBase):
@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
+from decimal import Decimal
 from app.schemas.shared import CurrencyCode, UTCBase
 
 
@@ -18,6 +19,10 @@ class SecurityBase(UTCBase):
     buyable: bool = False
     sellable: bool = False
     active_date: Optional[datetime] = None
+    underlying_symbol: Optional[str] = None
+    option_expiry: Optional[date] = None
+    option_strike: Optional[Decimal] = None
+    option_right: Optional[str] = None
 
 
 class SecurityCreate(SecurityBase):
@@ -2,7 +2,8 @@ from typing import List, Optional
 
 from app.repositories.activity_repository import ActivityRepository
 from app.repositories.base_repository import BaseRepository
-from app.schemas.schemas import ActivityResponse, AccountBase, AccountResponse
+from app.schemas.activity import ActivityAggregate
+from app.schemas.schemas import AccountBase, AccountResponse
 from app.database.models import Account
 
 
@@ -13,22 +14,33 @@ class AccountService:
         self.activity_repo = activity_repo
         self.account_repo = account_repo
 
-    async def get_total_dividends(self) -> float:
-        activities = await self.activity_repo.find_by_type("Dividends")
-        return sum(abs(activity.net_amount) for activity in activities)
-
-    async def get_commissions(self) -> List[ActivityResponse]:
-        activities = await self.activity_repo.find_negative_commissions()
-        return [
-            ActivityResponse(
-                id=activity.id,
-                type=activity.type,
-                commission=abs(activity.commission),
-                currency=activity.currency,
-                created_at=activity.created_at,
-            )
-            for activity in activities
-        ]
+    async def get_total_dividends(self, db, **filters) -> float:
+        (row,) = await self.activity_repo.aggregate_dividends(db, **filters)
+        return float(row["total"])
+
+    async def get_total_commissions(self, db, **filters) -> float:
+        (row,) = await self.activity_repo.aggregate_commissions(db, **filters)
+        return float(row["total"])
+
+    async def get_trades_count(self, db, **filters) -> int:
+        (row,) = await self.activity_repo.aggregate_trades(db, **filters)
+        return row["count"]
+
+    async def summarize_activities(
+        self, db, kind: str, **filters
+    ) -> List[ActivityAggregate]:
+        aggregate = {
+            "dividends": self.activity_repo.aggregate_dividends,
+            "commissions": self.activity_repo.aggregate_commissions,
+            "trades": self.activity_repo.aggregate_trades,
+        }[kind]
+        return [ActivityAggregate(**row) for row in await aggregate(db, **filters)]
+
+    async def get_commissions(self, db, **filters) -> List[ActivityAggregate]:
+        """Commission totals per account and currency."""
+        return await self.summarize_activities(
+            db, "commissions", group_by=("account", "currency"), **filters
+        )
 
     async def get_all_accounts(self, db) -> List[AccountResponse]:
         accounts = await self.account_repo.get_all_accounts(db)
@@ -1,162 +1,164 @@
-from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from fastapi import Depends
-from ..data.constants import WSIMPLE_ACTIVITY_TYPE_DICT
-from database.models import Activity, Security
-from schemas.schemas import TotalAmountResponse, TradesCountResponse, ActivityResponse
+from app.database.models import Security
+from app.schemas.activity import (
+    TotalAmountResponse,
+    TradesCountResponse,
+)
+from app.schemas.security import SecurityCreate
+from app.utils.option_symbols import option_columns
+from app.utils.utils import to_utc_datetime
+from config.settings import settings
 from fastapi import APIRouter
-from sqlalchemy.orm import Session
-from database.connection import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.connection import get_db
+from app.repositories.activity_repository import ActivityRepository
 
 router = APIRouter()
 
 
-async def get_trades_count(self) -> int:
-    activities = await self.activity_repo.find_by_type("Trades")
-    return len(activities)
-
-
-async def refresh_activities(self, source_id: str) -> List[ActivityResponse]:
-    new_activities = await self.activity_repo.regenerate_from_source(source_id).__dict__
-    return [ActivityResponse.model_validate(a) for a in new_activities]
-
-
-async def get_activity_action(action_dict: dict):
-    obj, order_type, auto_order_type = action_dict.values()
-    if obj == "dividend":
-        return "DRIP" if auto_order_type == "dividend_reinvestment" else "Cash Dividend"
-    return order_type.split("_")[0].capitalize() if order_type else None
-
-
-async def set_activity_amount_value(data: dict):
-    if "filled_net_value" in data:
-        return data["filled_net_value"]
-    if data["object"] == "dividend":
-        return data["net_cash"]["amount"]
+def get_feed_item_action(item: dict) -> Optional[str]:
+    item_type = item.get("type") or ""
+    if item_type.endswith("_BUY"):
+        return "Buy"
+    if item_type.endswith("_SELL"):
+        return "Sell"
+    if item_type == "DIVIDEND":
+        return "Cash Dividend"
+    if item_type == "STOCK_DIVIDEND":
+        return "DRIP"
     return None
 
 
-async def set_activity_price(activity: dict):
-    amount = set_activity_amount_value(activity)
-    if activity.get("object") == "order" and amount:
-        quantity = activity.get("fill_quantity", activity.get("quantity", 0))
-        return round(float(amount) / float(quantity), 2) if quantity else 0
-    return 0
-
-
-async def set_activity_currency(activity: dict):
-    if currency := activity.get("currency"):
-        return currency.upper()
-    if activity.get("object") == "order" and "limit_price" in activity:
-        return activity["limit_price"]["currency"].upper()
-    if currency := activity.get("account_currency"):
-        return currency.upper()
-    if activity.get("object") == "dividend" and "market_value" in activity:
-        return activity["market_value"]["currency"]
-    return "None"
-
-
-async def clean_fetch_activities_data(activities):
-    activitiesObjList = []
-    securitiesObjList = []
-
-    for activity in activities:
-        print(activity)
-        actionFnData = {
-            "object": activity["object"],
-            "orderType": activity["order_type"] if "order_type" in activity else None,
-            "autoOrderType": (
-                activity["auto_order_type"] if "auto_order_type" in activity else None
-            ),
-        }
-        amountValue = set_activity_amount_value(activity)
-        symbolVal = activity["symbol"] if "symbol" in activity else None
-
-        accountIdVal = ""
-        if "internal_transfer" in activity:
-            accountIdVal = activity["destination_account_id"]
-        if "account_id" in activity:
-            accountIdVal = activity["account_id"]
-        marketCurrency = ""
-        if "market_currency" in activity:
-            marketCurrency = activity["market_currency"]
-        elif "net_cash" in activity:
-            marketCurrency = activity["net_cash"]["currency"]
-        else:
-            marketCurrency = None
-        activityObj = Activity(
-            id=activity["id"],
-            currency=set_activity_currency(activity),
-            type=WSIMPLE_ACTIVITY_TYPE_DICT[activity["object"]],
-            sub_type=(
-                activity["order_sub_type"] if "order_sub_type" in activity else None
-            ),
-            action=get_activity_action(actionFnData),
-            stop_price=activity["stop_price"] if "stop_price" in activity else 0,
-            price=set_activity_price(activity),
-            quantity=activity["quantity"] if "quantity" in activity else 0,
-            symbol=symbolVal,
-            amount=amountValue,
-            commission=(
-                activity["filledTotalTransactionFee"]["amount"]
-                if "filledTotalTransactionFee" in activity
-                else 0
-            ),
-            option_multiplier=(
-                activity["option_multiplier"]
-                if "option_multiplier" in activity
-                else None
-            ),
-            market_currency=marketCurrency,
-            status=activity["status"] if "status" in activity else None,
-            cancelled_at=(
-                activity["cancelled_at"] if "cancelled_at" in activity else None
-            ),
-            rejected_at=activity["rejected_at"] if "rejected_at" in activity else None,
-            submitted_at=(
-                activity["submitted_at"] if "submitted_at" in activity else None
-            ),
-            filled_at=activity["filled_at"] if "filled_at" in activity else None,
-            account_id=accountIdVal,
-            security_id=activity["security_id"] if "security_id" in activity else None,
-        )
-        activitiesObjList.append(activityObj)
-        if "security_id" in activity and activity["security_id"] not in (
-            getattr(security, "id") for security in securitiesObjList
-        ):
-            securityObj = Security(
-                id=activity["security_id"],
-                symbol=symbolVal,
-                name=activity["security_name"],
-                currency=set_activity_currency(activity),
-            )
-            securitiesObjList.append(securityObj)
-    return activitiesObjList, securitiesObjList
-
-
-def get_total_amount(db: Session, query, field: str) -> float:
-    """Helper function to calculate total absolute amount from a database query."""
-    amount_list = [abs(float(getattr(item, field))) for item in query]
-    return round(sum(amount_list), 2)
+def get_feed_item_symbol(item: dict) -> Optional[str]:
+    """Asset symbol of a feed item; options get their OCC symbol so each
+    contract is a distinct security the option parser can decompose."""
+    symbol = item.get("assetSymbol")
+    if symbol and item.get("contractType") and item.get("expiryDate"):
+        expiry = datetime.fromisoformat(item["expiryDate"][:10])
+        strike = int(Decimal(item.get("strikePrice") or 0) * 1000)
+        right = "C" if item["contractType"].upper().startswith("C") else "P"
+        return f"{symbol}{expiry:%y%m%d}{right}{strike:08d}"
+    return symbol
+
+
+def _get(key: str, default=None) -> Callable[[dict], Any]:
+    return lambda item: item.get(key, default)
+
+
+def _get_timestamp(key: str) -> Callable[[dict], Optional[datetime]]:
+    def extract(item: dict) -> Optional[datetime]:
+        value = item.get(key)
+        return to_utc_datetime(value) if value else None
+
+    return extract
+
+
+# Columns read from every feed item, whatever its type.
+_FEED_ACTIVITY_FIELDS = (
+    ("id", itemgetter("canonicalId")),
+    ("currency", _get("currency")),
+    ("market_currency", _get("currency")),
+    ("sub_type", _get("subType")),
+    ("symbol", get_feed_item_symbol),
+    ("commission", lambda item: Decimal(item.get("fees") or 0)),
+    ("status", lambda item: item.get("unifiedStatus") or item.get("status")),
+    ("submitted_at", _get_timestamp("occurredAt")),
+    ("account_id", itemgetter("accountId")),
+)
+
+
+def _build_feed_plan(item_type: Optional[str]) -> tuple:
+    """Extraction plan for one feed item type: the constant columns resolved
+    once, the (column, extractor) pairs to run per item, and whether the type
+    is a trade, which gets a per-unit price."""
+    action = get_feed_item_action({"type": item_type})
+    constants = {
+        "type": settings.WSIMPLE_FEED_TYPE_DICT.get(item_type, "Other"),
+        "action": action,
+        "stop_price": None,
+        "option_multiplier": None,
+    }
+    return constants, _FEED_ACTIVITY_FIELDS, action in ("Buy", "Sell")
+
+
+_FEED_PLANS = {
+    item_type: _build_feed_plan(item_type)
+    for item_type in settings.WSIMPLE_FEED_TYPE_DICT
+}
+
+
+def build_feed_activity_rows(
+    items: Iterable[dict], security_ids: Dict[str, Optional[str]]
+) -> List[dict]:
+    """Map Wealthsimple activity feed items (FetchActivityFeedItems) to
+    activity rows.
+
+    Each row is a plain dict with the same keys for every row, ready for
+    `insert(Activity).values(rows)`. `security_ids` maps an item's
+    `securityId` to the id its security is stored under, which differs when
+    the symbol was already known.
+    """
+    rows = []
+    for item in items:
+        item_type = item.get("type")
+        plan = _FEED_PLANS.get(item_type)
+        if plan is None:
+            plan = _FEED_PLANS[item_type] = _build_feed_plan(item_type)
+        constants, fields, is_trade = plan
+
+        row = dict(constants)
+        for column, extract in fields:
+            row[column] = extract(item)
+        row["filled_at"] = row["submitted_at"]
+        quantity = Decimal(item.get("assetQuantity") or 0)
+        amount = abs(Decimal(item.get("amount") or 0))
+        row["quantity"] = quantity
+        row["amount"] = amount
+        row["price"] = round(amount / quantity, 2) if is_trade and quantity else 0
+        row["security_id"] = security_ids.get(item.get("securityId"))
+        rows.append(row)
+    return rows
+
+
+def build_feed_security(item: dict) -> Security:
+    symbol = get_feed_item_symbol(item)
+    columns = option_columns(symbol)
+    security_data = SecurityCreate(
+        id=item["securityId"],
+        symbol=symbol,
+        name=None,
+        description=None,
+        type="Option" if columns["option_right"] else "Equity",
+        currency=item.get("currency"),
+        status=None,
+        exchange=None,
+        option_details=None,
+        order_subtypes=None,
+        **columns,
+    )
+    return Security(**security_data.model_dump())
 
 
 @router.get("/account/dividends", response_model=TotalAmountResponse)
-def get_account_dividends(db: Session = Depends(get_db)):
+async def get_account_dividends(db: AsyncSession = Depends(get_db)):
     """Returns total dividends amount."""
-    query = db.query(Activity).filter(Activity.type == "Dividends").all()
-    total_amount = get_total_amount(db, query, "netAmount")
-    return {"totalAmount": total_amount}
+    (row,) = await ActivityRepository().aggregate_dividends(db)
+    return {"totalAmount": row["total"]}
 
 
 @router.get("/account/commissions", response_model=TotalAmountResponse)
-def get_account_commissions(db: Session = Depends(get_db)):
+async def get_account_commissions(db: AsyncSession = Depends(get_db)):
     """Returns total commission amount."""
-    query = db.query(Activity).filter(Activity.commission < 0).all()
-    total_amount = get_total_amount(db, query, "commission")
-    return {"totalAmount": total_amount}
+    (row,) = await ActivityRepository().aggregate_commissions(db)
+    return {"totalAmount": row["total"]}
 
 
 @router.get("/account/trades/count", response_model=TradesCountResponse)
-def get_account_trades_count(db: Session = Depends(get_db)):
+async def get_account_trades_count(db: AsyncSession = Depends(get_db)):
     """Returns the count of trading activities."""
-    trade_count = db.query(Activity).filter(Activity.type == "Trades").count()
-    return {"tradesCount": trade_count}
+    (row,) = await ActivityRepository().aggregate_trades(db)
+    return {"tradesCount": row["count"]}
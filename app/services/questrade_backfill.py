@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.connection import sessionLocal
+from app.repositories.account_respository import AccountRepository
+from app.repositories.activity_repository import ActivityRepository
+from app.repositories.backfill_repository import BackfillRepository
+from app.repositories.security_repository import SecurityRepository
+from app.services.questrade_service import QuestradeService
+from config.settings import settings
+
+logger = logging.getLogger("pytrade_api")
+
+
+class QuestradeBackfillRunner:
+    """Runs Questrade backfill jobs as background tasks outside the request.
+
+    Each job runs in its own database session and is claimed in the database
+    before it starts, so a job is never worked on twice. While it runs, a
+    heartbeat task bumps the claim every QUESTRADE_BACKFILL_HEARTBEAT_SECONDS,
+    however long a window or a rate-limit wait takes. Jobs left behind by a
+    shutdown or crash are resumed from their checkpoints at startup.
+    """
+
+    def __init__(self):
+        self.backfill_repo = BackfillRepository(logger=logger)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _build_service(self) -> QuestradeService:
+        return QuestradeService(
+            account_repo=AccountRepository(logger=logger),
+            activity_repo=ActivityRepository(logger=logger),
+            security_repo=SecurityRepository(logger=logger),
+            backfill_repo=self.backfill_repo,
+            logger=logger,
+        )
+
+    async def start(self, db: AsyncSession, full: bool = False) -> dict:
+        job = await self._build_service().create_backfill_job(db, full=full)
+        self.launch(job.id)
+        return await self.backfill_repo.get_job_progress(db, job.id)
+
+    def launch(self, job_id: str) -> bool:
+        task = self._tasks.get(job_id)
+        if task is not None and not task.done():
+            return False
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return True
+
+    async def _run(self, job_id: str) -> None:
+        async with sessionLocal() as db:
+            if not await self.backfill_repo.claim_job(db, job_id):
+                logger.info(f"Backfill job {job_id} is already running elsewhere")
+                return
+            job = await self.backfill_repo.get_job(db, job_id)
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                try:
+                    result = await self._build_service().run_backfill_job(db, job)
+                finally:
+                    heartbeat.cancel()
+            except asyncio.CancelledError:
+                await db.rollback()
+                await self.backfill_repo.finish_job(db, job_id, "interrupted")
+                raise
+            except Exception as e:
+                await db.rollback()
+                logger.exception(f"Backfill job {job_id} failed")
+                await self.backfill_repo.finish_job(db, job_id, "failed", str(e))
+                return
+
+            await self.backfill_repo.finish_job(db, job_id, "done")
+            logger.info(f"Backfill job {job_id} finished: {result}")
+
+    async def _heartbeat(self, job_id: str) -> None:
+        # Its own session: the job's session is busy with the backfill.
+        while True:
+            await asyncio.sleep(settings.QUESTRADE_BACKFILL_HEARTBEAT_SECONDS)
+            try:
+                async with sessionLocal() as db:
+                    await self.backfill_repo.touch_job(db, job_id)
+            except Exception:
+                logger.exception(f"Backfill job {job_id} heartbeat failed")
+
+    async def get_progress(self, db: AsyncSession, job_id: str) -> Optional[dict]:
+        return await self.backfill_repo.get_job_progress(db, job_id)
+
+    async def resume_pending(self) -> None:
+        async with sessionLocal() as db:
+            job_ids = await self.backfill_repo.get_resumable_job_ids(db)
+        for job_id in job_ids:
+            logger.info(f"Resuming backfill job {job_id}")
+            self.launch(job_id)
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+questrade_backfill = QuestradeBackfillRunner()
@@ -1,28 +1,51 @@
-import calendar, re, traceback, uuid, time, asyncio, functools, inspect
-from datetime import datetime, timezone
-from pathlib import Path
+import traceback, uuid, functools
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from qtrade_rr import Questrade
 
-from app.database.models import Activity, Security
+from app.brokers.questrade.client import QuestradeClient
+from app.brokers.questrade.tokens import questrade_tokens
+from app.database.models import Activity, BackfillJob, Security
+from app.errors import InvalidRefreshTokenError, QuestradeUnauthorizedError
 from app.schemas.activity import ActivityCreate
 from app.schemas.security import SecurityCreate
 from app.repositories.account_respository import AccountRepository
 from app.repositories.security_repository import SecurityRepository
 from app.repositories.activity_repository import ActivityRepository
+from app.repositories.backfill_repository import BackfillRepository
 from config.settings import settings
-from app.utils.utils import (
-    open_file,
-    write_file,
-    generate_expiry_timestamp,
-    yaml_file_exists,
-    utc_now,
+from app.utils.ordered_fetcher import OrderedFetcher
+from app.utils.rate_limiter import RateLimiter
+from app.utils.option_symbols import option_columns, parse_option_symbol
+from app.utils.utils import utc_now, to_utc_datetime
+
+QUESTRADE_ACTIVITY_ID_FIELDS = (
+    "tradeDate",
+    "transactionDate",
+    "settlementDate",
+    "type",
+    "action",
+    "symbolId",
+    "quantity",
+    "price",
+    "grossAmount",
+    "netAmount",
+    "commission",
+    "currency",
+    "description",
 )
 
+# Left to refresh_token_if_unauthorized rather than wrapped in a 400.
+QUESTRADE_AUTH_ERRORS = (QuestradeUnauthorizedError, InvalidRefreshTokenError)
 
-base_path = Path(__file__).parent.parent
-file_path = (base_path / "brokers/questrade.yaml").resolve()
+questrade_rate_limiter = RateLimiter(
+    [
+        (settings.QUESTRADE_MAX_REQUESTS_PER_SECOND, 1),
+        (settings.QUESTRADE_MAX_REQUESTS_PER_HOUR, 3600),
+    ]
+)
 
 
 class QuestradeService:
@@ -31,6 +54,7 @@ class QuestradeService:
         account_repo: AccountRepository = None,
         activity_repo: ActivityRepository = None,
         security_repo: SecurityRepository = None,
+        backfill_repo: BackfillRepository = None,
         logger=None,
     ):
         self.logger = logger
@@ -38,155 +62,194 @@ class QuestradeService:
         self.account_repo = account_repo
         self.activity_repo = activity_repo
         self.security_repo = security_repo
+        self.backfill_repo = backfill_repo
 
-    def is_token_valid(self, expires_at: int, buffer_seconds: int = 60) -> bool:
-        current_time = int(time.time())
-        print(
-            f"Current time: {current_time + buffer_seconds}, Expires at: {expires_at}"
-        )
-        return (current_time + buffer_seconds) < expires_at
-
-    def get_new_tokens(self) -> bool:
-        try:
-            input_access_code = input(
-                "Token refresh failed. Please enter a new access code: "
-            )
-            qt = Questrade(access_code=input_access_code)
-            token_expiry = generate_expiry_timestamp(qt.access_token["expires_in"])
-            qt.access_token["expires_at"] = token_expiry
-            print("New access code tokens ->", qt.access_token)
-            return qt
+    def refresh_token_if_unauthorized(fn):
+        """Refresh the token and retry once when Questrade rejects it with a 401.
 
-        except Exception as input_exc:
-            print("Failed to authenticate with new access code:", input_exc)
-            raise input_exc
+        A missing or rejected refresh token raises InvalidRefreshTokenError,
+        which propagates like every other error until a new refresh token is
+        supplied through `authenticate`.
+        """
 
-    def refresh_token_if_unauthorized(fn):
         @functools.wraps(fn)
         async def async_wrapper(self, *args, **kwargs):
             if self._client is None:
-                auth_result = self.authenticate()
-                if asyncio.iscoroutine(auth_result):
-                    await auth_result
+                await self.authenticate()
 
             try:
                 return await fn(self, *args, **kwargs)
-            except Exception as e:
-                err_message = str(e).lower()
-                auth_error = (
-                    "unauthorized" in err_message
-                    or "401" in err_message
-                    or (
-                        "token" in err_message
-                        and ("expired" in err_message or "invalid" in err_message)
-                    )
-                )
-                if not auth_error:
-                    raise
-                try:
-                    refresh_result = self._client.refresh_access_token(
-                        from_yaml=True, yaml_path=file_path
-                    )
-                    if asyncio.iscoroutine(refresh_result):
-                        await refresh_result
-                except Exception as refresh_err:
-                    refresh_msg = str(refresh_err).lower()
-                    if "400" in refresh_msg or "bad request" in refresh_msg:
-                        reauth_result = self.authenticate()
-                        if asyncio.iscoroutine(reauth_result):
-                            await reauth_result
-                    else:
-                        raise
-                # Retry
+            except QuestradeUnauthorizedError:
+                await questrade_tokens.refresh(stale_token=self._client.access_token)
                 return await fn(self, *args, **kwargs)
 
-        @functools.wraps(fn)
-        def sync_wrapper(self, *args, **kwargs):
-            if self._client is None:
-                self.authenticate()
-
-            try:
-                return fn(self, *args, **kwargs)
-            except Exception as e:
-                err_message = str(e).lower()
-                auth_error = (
-                    "unauthorized" in err_message
-                    or "401" in err_message
-                    or (
-                        "token" in err_message
-                        and ("expired" in err_message or "invalid" in err_message)
-                    )
-                )
-                if not auth_error:
-                    raise
+        return async_wrapper
 
-                # Try refresh
-                try:
-                    self._client.refresh_access_token(
-                        from_yaml=True, yaml_path=file_path
-                    )
-                except Exception as refresh_err:
-                    refresh_msg = str(refresh_err).lower()
-                    if "400" in refresh_msg or "bad request" in refresh_msg:
-                        self.authenticate()
-                    else:
-                        raise
-                # Retry
-                return fn(self, *args, **kwargs)
-
-        if inspect.iscoroutinefunction(fn):
-            return async_wrapper
-        else:
-            return sync_wrapper
-
-    def authenticate(self):
-        tokens = open_file(file_path)
-        print("Tokens loaded from file:", tokens)
+    async def authenticate(self, refresh_token: Optional[str] = None):
         try:
-            if yaml_file_exists(file_path):
-                print("YAML file exists, loading tokens from it.")
-                yaml_token = open_file(file_path)
-                print("YAML token loaded:", yaml_token)
-                qt = Questrade(token_yaml=file_path)
-                if self.is_token_valid(
-                    qt.access_token.get("expires_at", 0), buffer_seconds=60
-                ):
-                    print("Yaml Access token is valid, using existing client.")
-
-                    qt.access_token = yaml_token
-                    self._client = qt
-                    return True
-                else:
-                    print("Yaml Access token is invalid, refreshing...")
-                    try:
-                        qt.refresh_access_token(from_yaml=True, yaml_path=file_path)
-                    except Exception as refresh_error:
-                        print(f"Token refresh failed: {refresh_error}")
-                        print("Attempting to re-authenticate with new access code...")
-                        qt = self.get_new_tokens()
-                    self._client = qt
-                    write_file(file_path, qt.access_token)
-                    print("Refreshed access token and updated client.", qt.access_token)
-                    return True
+            if refresh_token:
+                await questrade_tokens.set_refresh_token(refresh_token)
             else:
-                qt = self.get_new_tokens()
-                self._client = qt
-                write_file(file_path, qt.access_token)
-                print("Successfully authenticated with new access code.")
-
+                await questrade_tokens.get_token()
+        except QUESTRADE_AUTH_ERRORS:
+            raise
         except Exception as e:
             raise RuntimeError("Authentication failed") from e
+        self._client = QuestradeClient(token_provider=questrade_tokens)
+        return True
+
+    async def refresh_tokens(self):
+        await questrade_tokens.refresh()
+        return True
 
     def get_activity_action(self, activity):
         if activity["type"] == "Trades":
             value = float(activity["netAmount"])
             return "Sell" if value > 0 else "Buy" if value < 0 else None
 
+    def get_sync_start_time(self, account, full: bool = False) -> datetime:
+        """Start of the activity range to fetch for an account.
+
+        Resumes from the account's high-water mark minus a small overlap so late
+        corrections are picked up, or from the start of history on a full sync.
+        """
+        history_start = settings.QUESTRADE_HISTORY_START
+        if full or account.last_activity_synced_at is None:
+            return history_start
+        resume_from = account.last_activity_synced_at - timedelta(
+            days=settings.QUESTRADE_SYNC_OVERLAP_DAYS
+        )
+        return max(resume_from.astimezone(settings.QUESTRADE_TIMEZONE), history_start)
+
+    @staticmethod
+    def get_activity_windows(start_time: datetime, end_time: datetime):
+        """Split [start_time, end_time) into calendar-month windows.
+
+        Questrade rejects activity requests spanning more than 31 days.
+        """
+        window_start = start_time
+        while window_start < end_time:
+            if window_start.month == 12:
+                next_month = window_start.replace(
+                    year=window_start.year + 1,
+                    month=1,
+                    day=1,
+                    hour=0,
+                    minute=0,
+                    second=0,
+                    microsecond=0,
+                )
+            else:
+                next_month = window_start.replace(
+                    month=window_start.month + 1,
+                    day=1,
+                    hour=0,
+                    minute=0,
+                    second=0,
+                    microsecond=0,
+                )
+            window_end = min(next_month, end_time)
+            yield window_start, window_end
+            window_start = window_end
+
+    @staticmethod
+    def get_high_water_mark(account, newest_settled_at, end_time: datetime):
+        """Newest settled activity seen for an account, never moving backwards.
+
+        Accounts without any activity yet are marked up to the end of the synced
+        range so they are not backfilled again on every run.
+        """
+        candidates = [
+            mark
+            for mark in (newest_settled_at, account.last_activity_synced_at)
+            if mark is not None
+        ]
+        if not candidates:
+            return end_time
+        return min(max(candidates), end_time)
+
+    @staticmethod
+    def assign_activity_ids(activities: list, account_number: str) -> None:
+        """Give Questrade activities a stable id derived from their content.
+
+        The API does not return activity ids, so overlapping re-fetches would
+        otherwise insert duplicates. Identical rows within one response are told
+        apart by their position among their duplicates.
+        """
+        occurrences = Counter()
+        for activity in activities:
+            key = "|".join(
+                str(activity.get(field)) for field in QUESTRADE_ACTIVITY_ID_FIELDS
+            )
+            activity.setdefault(
+                "id",
+                uuid.uuid5(
+                    uuid.NAMESPACE_URL,
+                    f"questrade:{account_number}:{key}:{occurrences[key]}",
+                ).hex,
+            )
+            occurrences[key] += 1
+
+    def build_security(self, activity: dict, is_option: bool) -> Security:
+        security_data = SecurityCreate(
+            id=str(activity["symbolId"]),
+            symbol=activity["symbol"],
+            name=activity.get("name"),
+            description=activity.get("description", None),
+            option_details=activity.get("option_details", None),
+            order_subtypes=activity.get("order_subtypes", None),
+            type="Option" if is_option else "Equity",
+            currency=activity["currency"],
+            status=activity.get("status", None),
+            exchange=activity.get("exchange", None),
+            trade_eligible=activity.get("trade_eligible", False),
+            options_eligible=activity.get("options_eligible", False),
+            buyable=activity.get("buyable", False),
+            sellable=activity.get("sellable", False),
+            active_date=activity.get("active_date"),
+            created_at=activity.get("created_at") or utc_now(),
+            last_synced=activity.get("last_synced") or utc_now(),
+            **option_columns(activity["symbol"]),
+        )
+        return Security(**security_data.model_dump())
+
+    def build_activity(
+        self, activity: dict, account_number: str, is_option: bool
+    ) -> Activity:
+        activity_type = (
+            "Option"
+            if is_option
+            else ("Order" if activity["type"] == "Trades" else activity["type"])
+        )
+        activity_type = settings.QUESTRADE_ACTIVITY_TYPE_DICT.get(activity_type, None)
+        activity_data = ActivityCreate(
+            id=activity.get("id", uuid.uuid4().hex),
+            currency=activity["currency"],
+            type=activity_type,
+            status=(
+                "Filled"
+                if (activity_type == "Order" or activity_type == "Deposit")
+                else activity.get("status")
+            ),
+            action=self.get_activity_action(activity),
+            price=activity.get("price"),
+            quantity=activity.get("quantity"),
+            amount=abs(activity.get("netAmount")),
+            commission=activity.get("commission"),
+            symbol=activity.get("symbol"),
+            submitted_at=activity.get("tradeDate"),
+            filled_at=activity.get("settlementDate"),
+            security_id=(
+                str(activity.get("symbolId")) if activity["type"] == "Trades" else None
+            ),
+            account_id=account_number,
+        )
+        return Activity(**activity_data.model_dump())
+
     @refresh_token_if_unauthorized
     async def sync_accounts(self, db: AsyncSession):
         try:
-            self.authenticate()
-            fetched_accounts = self._client.get_accounts()
+            fetched_accounts = await self._client.get_accounts()
             print("Fetched ACCOUNTS -> ", fetched_accounts)
             import inspect
 
@@ -201,154 +264,291 @@ class QuestradeService:
 
             return {"count": len(saved_accounts), "saved_accounts": saved_accounts}
 
+        except QUESTRADE_AUTH_ERRORS:
+            raise
         except Exception as e:
             print(traceback.format_exc())
             raise HTTPException(status_code=400, detail=str(e))
 
+    async def fetch_activity_window(self, window: tuple) -> list:
+        account, window_start, window_end = window
+        return await self._client.get_account_activities(
+            str(account.account_number),
+            start_date=window_start,
+            end_date=window_end,
+        )
+
+    @staticmethod
+    def new_activity_batch() -> dict:
+        return {
+            "activities": [],
+            "securities": [],
+            "newest_settled_at": None,
+            "security_count": 0,
+            "activity_count": 0,
+        }
+
+    def add_window_to_batch(
+        self, batch: dict, activities: list, account_number: str, security_ids: set
+    ) -> None:
+        """Build the activities of one fetched window (and any securities not
+        seen yet in this sync) into the pending batch."""
+        self.assign_activity_ids(activities, account_number)
+
+        for activity in activities:
+            is_option = parse_option_symbol(activity["symbol"]) is not None
+
+            if (
+                activity["type"] == "Trades"
+                and "symbolId" in activity
+                and str(activity["symbolId"]) not in security_ids
+            ):
+                batch["securities"].append(self.build_security(activity, is_option))
+                security_ids.add(str(activity["symbolId"]))
+
+            batch["activities"].append(
+                self.build_activity(activity, account_number, is_option)
+            )
+
+            if activity.get("settlementDate"):
+                settled_at = to_utc_datetime(activity["settlementDate"])
+                newest = batch["newest_settled_at"]
+                if newest is None or settled_at > newest:
+                    batch["newest_settled_at"] = settled_at
+
+    async def add_known_security_ids(
+        self, db: AsyncSession, activities: list, security_ids: set
+    ) -> None:
+        """Add ids of this window's securities that are already stored to
+        `security_ids`, so only genuinely new securities get built."""
+        candidates = {
+            str(activity["symbolId"])
+            for activity in activities
+            if activity["type"] == "Trades" and "symbolId" in activity
+        }
+        candidates -= security_ids
+        if candidates:
+            security_ids |= await self.security_repo.get_known_security_ids(
+                db, candidates
+            )
+
+    async def flush_activity_batch(self, db: AsyncSession, batch: dict) -> None:
+        """Persist buffered securities, then the activities referencing them."""
+        if batch["securities"]:
+            saved_securities = await self.security_repo.save_securities(
+                db, batch["securities"]
+            )
+            batch["security_count"] += len(saved_securities)
+            batch["securities"] = []
+        if batch["activities"]:
+            saved_activities = await self.activity_repo.save_activities(
+                db, batch["activities"]
+            )
+            batch["activity_count"] += len(saved_activities)
+            batch["activities"] = []
+
+    async def finish_account_sync(
+        self, db: AsyncSession, account, batch: dict, end_time: datetime
+    ) -> None:
+        await self.flush_activity_batch(db, batch)
+        await self.account_repo.update_account(
+            db,
+            str(account.account_number),
+            {
+                "last_activity_synced_at": self.get_high_water_mark(
+                    account, batch["newest_settled_at"], end_time
+                )
+            },
+        )
+        batch["newest_settled_at"] = None
+
     @refresh_token_if_unauthorized
-    async def sync_activities(self, db: AsyncSession):
+    async def sync_activities(self, db: AsyncSession, full: bool = False):
         try:
-            self.authenticate()
-
             fetched_accounts = await self.account_repo.get_accounts_by_broker_name(
                 db=db, broker_name="Questrade"
             )
 
-            activities_to_save = []
-            securities_to_save = []
-            security_ids = set()
-
-            for account in fetched_accounts:
-                account_number = str(account.account_number)
+            end_time = datetime.now(tz=settings.QUESTRADE_TIMEZONE)
+            windows = [
+                (account, window_start, window_end)
+                for account in fetched_accounts
+                for window_start, window_end in self.get_activity_windows(
+                    self.get_sync_start_time(account, full=full), end_time
+                )
+            ]
+            fetcher = OrderedFetcher(
+                self.fetch_activity_window,
+                concurrency=settings.QUESTRADE_FETCH_CONCURRENCY,
+                rate_limiter=questrade_rate_limiter,
+            )
 
-                for year in range(2019, 2025):
-                    for month in range(1, 13):
-                        last_day = calendar.monthrange(year, month)[1]
-                        start_time = datetime(
-                            year, month, 1, tzinfo=settings.QUESTRADE_TIMEZONE
-                        )
-                        end_time = datetime(
-                            year, month, last_day, tzinfo=settings.QUESTRADE_TIMEZONE
+            security_ids = set()
+            current_account = None
+            batch = self.new_activity_batch()
+
+            async for (account, _, _), acitivities in fetcher.iter_results(windows):
+                if account is not current_account:
+                    if current_account is not None:
+                        await self.finish_account_sync(
+                            db, current_account, batch, end_time
                         )
+                    current_account = account
 
-                        acitivities = self._client.get_account_activities(
-                            account_number, start_date=start_time, end_date=end_time
-                        )
+                await self.add_known_security_ids(db, acitivities, security_ids)
+                self.add_window_to_batch(
+                    batch, acitivities, str(account.account_number), security_ids
+                )
 
-                        options_pattern = r"^.*\d{1,2}[A-Za-z]{3}\d{2}P\d{1,}\.\d{2}$"
-
-                        for activity in acitivities:
-                            is_option = bool(
-                                re.match(options_pattern, activity["symbol"])
-                            )
-                            activity_type = (
-                                "Option"
-                                if is_option
-                                else (
-                                    "Order"
-                                    if activity["type"] == "Trades"
-                                    else activity["type"]
-                                )
-                            )
-
-                            if (
-                                activity["type"] == "Trades"
-                                and "symbolId" in activity
-                                and activity["symbolId"] not in security_ids
-                            ):
-                                security_data = SecurityCreate(
-                                    id=str(activity["symbolId"]),
-                                    symbol=activity["symbol"],
-                                    name=activity.get("name"),
-                                    description=activity.get("description", None),
-                                    option_details=activity.get("option_details", None),
-                                    order_subtypes=activity.get("order_subtypes", None),
-                                    type="Option" if is_option else "Equity",
-                                    currency=activity["currency"],
-                                    status=activity.get("status", None),
-                                    exchange=activity.get("exchange", None),
-                                    trade_eligible=activity.get(
-                                        "trade_eligible", False
-                                    ),
-                                    options_eligible=activity.get(
-                                        "options_eligible", False
-                                    ),
-                                    buyable=activity.get("buyable", False),
-                                    sellable=activity.get("sellable", False),
-                                    active_date=activity.get("active_date"),
-                                    created_at=activity.get("created_at") or utc_now(),
-                                    last_synced=activity.get("last_synced")
-                                    or utc_now(),
-                                )
-                                securities_to_save.append(
-                                    Security(**security_data.model_dump())
-                                )
-                                security_ids.add(activity["symbolId"])
-                                print("ACITIVITY ", activity)
-                                activity_type = (
-                                    settings.QUESTRADE_ACTIVITY_TYPE_DICT.get(
-                                        activity_type, None
-                                    )
-                                )
-                                activity_data = ActivityCreate(
-                                    id=activity.get("id", uuid.uuid4().hex),
-                                    currency=activity["currency"],
-                                    type=activity_type,
-                                    status=(
-                                        "Filled"
-                                        if (
-                                            activity_type == "Order"
-                                            or activity_type == "Deposit"
-                                        )
-                                        else activity.get("status")
-                                    ),
-                                    action=self.get_activity_action(activity),
-                                    price=activity.get("price"),
-                                    quantity=activity.get("quantity"),
-                                    amount=abs(activity.get("netAmount")),
-                                    commission=activity.get("commission"),
-                                    symbol=activity.get("symbol"),
-                                    submitted_at=activity.get("tradeDate"),
-                                    filled_at=activity.get("settlementDate"),
-                                    security_id=(
-                                        str(activity.get("symbolId"))
-                                        if activity["type"] == "Trades"
-                                        else None
-                                    ),
-                                    account_id=account_number,
-                                )
-                                activities_to_save.append(
-                                    Activity(**activity_data.model_dump())
-                                )
+                if len(batch["activities"]) >= settings.SYNC_FLUSH_ROWS:
+                    await self.flush_activity_batch(db, batch)
 
-            saved_securities = await self.security_repo.save_securities(
-                db, securities_to_save
-            )
-            print("Securities Count:", len(saved_securities))
-            saved_activities = await self.activity_repo.save_activities(
-                db, activities_to_save
-            )
-            print("Activities Count:", len(saved_activities))
+            if current_account is not None:
+                await self.finish_account_sync(db, current_account, batch, end_time)
+
+            print("Securities Count:", batch["security_count"])
+            print("Activities Count:", batch["activity_count"])
             return {
-                "security_count": len(saved_securities),
-                "activity_count": len(saved_activities),
+                "security_count": batch["security_count"],
+                "activity_count": batch["activity_count"],
             }
 
+        except QUESTRADE_AUTH_ERRORS:
+            raise
         except Exception as e:
             print(traceback.format_exc())
             raise HTTPException(status_code=400, detail=str(e))
 
+    async def create_backfill_job(
+        self, db: AsyncSession, full: bool = False
+    ) -> BackfillJob:
+        """Plan a backfill as one checkpoint per account and month window."""
+        fetched_accounts = await self.account_repo.get_accounts_by_broker_name(
+            db=db, broker_name="Questrade"
+        )
+        end_time = datetime.now(tz=settings.QUESTRADE_TIMEZONE)
+        windows = [
+            (str(account.account_number), window_start, window_end)
+            for account in fetched_accounts
+            for window_start, window_end in self.get_activity_windows(
+                self.get_sync_start_time(account, full=full), end_time
+            )
+        ]
+        return await self.backfill_repo.create_job(
+            db, "Questrade", full, end_time, windows
+        )
+
+    async def finish_backfill_account(
+        self, db: AsyncSession, job: BackfillJob, account
+    ) -> None:
+        newest_settled_at = await self.backfill_repo.get_newest_settled_at(
+            db, job.id, str(account.account_number)
+        )
+        await self.account_repo.update_account(
+            db,
+            str(account.account_number),
+            {
+                "last_activity_synced_at": self.get_high_water_mark(
+                    account, newest_settled_at, job.end_time
+                )
+            },
+        )
+
+    @refresh_token_if_unauthorized
+    async def run_backfill_job(self, db: AsyncSession, job: BackfillJob) -> dict:
+        """Fetch and persist every pending window of a job, checkpointing each.
+
+        A window is marked done only after its rows are committed, so a job
+        that is interrupted resumes at the first window it had not persisted.
+        """
+        fetched_accounts = await self.account_repo.get_accounts_by_broker_name(
+            db=db, broker_name="Questrade"
+        )
+        accounts = {
+            str(account.account_number): account for account in fetched_accounts
+        }
+        pending = await self.backfill_repo.get_pending_checkpoints(db, job.id)
+        missing = sorted(
+            {checkpoint.account_id for checkpoint in pending} - accounts.keys()
+        )
+        skipped_count = 0
+        if missing:
+            skipped_count = await self.backfill_repo.skip_checkpoints(
+                db, job.id, missing
+            )
+            if self.logger:
+                self.logger.warning(
+                    f"Backfill job {job.id}: skipped {skipped_count} windows of "
+                    f"accounts no longer stored: {', '.join(missing)}"
+                )
+        checkpoints = [
+            checkpoint for checkpoint in pending if checkpoint.account_id in accounts
+        ]
+
+        async def fetch_checkpoint(checkpoint):
+            return await self.fetch_activity_window(
+                (
+                    accounts[checkpoint.account_id],
+                    checkpoint.window_start,
+                    checkpoint.window_end,
+                )
+            )
+
+        fetcher = OrderedFetcher(
+            fetch_checkpoint,
+            concurrency=settings.QUESTRADE_FETCH_CONCURRENCY,
+            rate_limiter=questrade_rate_limiter,
+        )
+
+        security_ids = set()
+        finished = set()
+        current_account_id = None
+        batch = self.new_activity_batch()
+
+        async for checkpoint, activities in fetcher.iter_results(checkpoints):
+            if checkpoint.account_id != current_account_id:
+                if current_account_id is not None:
+                    await self.finish_backfill_account(
+                        db, job, accounts[current_account_id]
+                    )
+                    finished.add(current_account_id)
+                current_account_id = checkpoint.account_id
+
+            batch["newest_settled_at"] = None
+            await self.add_known_security_ids(db, activities, security_ids)
+            self.add_window_to_batch(
+                batch, activities, checkpoint.account_id, security_ids
+            )
+            await self.flush_activity_batch(db, batch)
+            await self.backfill_repo.complete_checkpoint(
+                db, checkpoint, len(activities), batch["newest_settled_at"]
+            )
+
+        # Includes accounts whose last window was committed by an earlier run
+        # that stopped before finishing them; finishing is idempotent.
+        for account_id in await self.backfill_repo.get_account_ids(db, job.id):
+            if account_id in accounts and account_id not in finished:
+                await self.finish_backfill_account(db, job, accounts[account_id])
+
+        return {
+            "security_count": batch["security_count"],
+            "activity_count": batch["activity_count"],
+            "skipped_window_count": skipped_count,
+        }
+
     @refresh_token_if_unauthorized
-    async def sync_questrade_data(self, db: AsyncSession):
+    async def sync_questrade_data(self, db: AsyncSession, full: bool = False):
         try:
-            account_sync_result = self.sync_accounts(db)
-            activity_sync_result = self.sync_activities(db)
+            account_sync_result = await self.sync_accounts(db)
+            activity_sync_result = await self.sync_activities(db, full=full)
 
             return {
                 "accounts_synced": account_sync_result["count"],
                 "activities_synced": activity_sync_result["activity_count"],
             }
 
+        except QUESTRADE_AUTH_ERRORS:
+            raise
         except Exception as e:
             print(traceback.format_exc())
             raise HTTPException(status_code=400, detail=str(e))
@@ -1,4 +1,6 @@
-import keyring
+import json
+from datetime import date
+from decimal import Decimal
 from typing import Optional, Callable, Any, List, Dict
 from ws_api import (
     WealthsimpleAPI,
@@ -10,16 +12,63 @@ from ws_api import (
     CurlException,
     WSApiException,
 )
+from app.brokers.wealthsimple.client_pool import WealthsimpleClientPool
 from app.repositories.account_respository import AccountRepository
 from app.repositories.security_repository import SecurityRepository
 from app.repositories.activity_repository import ActivityRepository
+from app.repositories.financials_repository import FinancialsRepository
+from app.utils.cache import AsyncTTLCache
+from app.utils.downsample import last_per_period, lttb
+from app.utils.metered_executor import MeteredExecutor
+from app.utils.ordered_fetcher import OrderedFetcher
+from app.utils.session_cache import session_cache
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.services.activity_service import (
+    build_feed_activity_rows,
+    build_feed_security,
+    get_feed_item_symbol,
+)
+from app.schemas.shared import AccountType
+from app.utils.utils import to_utc_datetime, utc_now
+from config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 KEYRING_SERVICE = "wealthsimple.api"
 
+# Feed items ws_api's own get_activities leaves out.
+EXCLUDED_FEED_STATUSES = ("rejected", "cancelled", "expired")
+
+wealthsimple_clients = WealthsimpleClientPool(
+    max_size=settings.WEALTHSIMPLE_CLIENT_POOL_SIZE,
+    default_ttl=settings.WEALTHSIMPLE_CLIENT_TTL_SECONDS,
+    expiry_buffer=settings.WEALTHSIMPLE_TOKEN_EXPIRY_BUFFER_SECONDS,
+)
+
+# ws_api is synchronous; its calls run here instead of Starlette's threadpool.
+wealthsimple_executor = MeteredExecutor(
+    "wealthsimple", max_workers=settings.WEALTHSIMPLE_EXECUTOR_WORKERS
+)
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+# Quotes and search results are not user specific, so one entry serves everyone.
+security_search_cache = AsyncTTLCache(
+    ttl_seconds=settings.WEALTHSIMPLE_SEARCH_CACHE_TTL_SECONDS,
+    max_weight=settings.WEALTHSIMPLE_SEARCH_CACHE_MAX_BYTES,
+    weigh=_json_size,
+)
+security_quote_cache = AsyncTTLCache(
+    ttl_seconds=settings.WEALTHSIMPLE_QUOTE_CACHE_TTL_SECONDS,
+    max_weight=settings.WEALTHSIMPLE_QUOTE_CACHE_MAX_BYTES,
+    weigh=_json_size,
+)
+
 
 class WealthsimpleService:
 
@@ -28,6 +77,7 @@ class WealthsimpleService:
         account_repo: AccountRepository = None,
         activity_repo: ActivityRepository = None,
         security_repo: SecurityRepository = None,
+        financials_repo: FinancialsRepository = None,
         logger=None,
     ):
         self.logger = logger
@@ -35,23 +85,26 @@ class WealthsimpleService:
         self.account_repo = account_repo
         self.activity_repo = activity_repo
         self.security_repo = security_repo
+        self.financials_repo = financials_repo
 
     @staticmethod
     def _persist_session(session_json: str, username: str) -> None:
-        keyring.set_password(f"{KEYRING_SERVICE}.{username}", "session", session_json)
+        session_cache.set(f"{KEYRING_SERVICE}.{username}", "session", session_json)
+        wealthsimple_clients.invalidate(username)
 
     @staticmethod
     def _remove_session(username: str) -> None:
         """Remove invalid session from keyring to prevent future failures with same invalid session."""
+        wealthsimple_clients.invalidate(username)
         try:
-            keyring.delete_password(f"{KEYRING_SERVICE}.{username}", "session")
+            session_cache.delete(f"{KEYRING_SERVICE}.{username}", "session")
             logger.info(f"Removed invalid session for user: {username}")
         except Exception as e:
             logger.warning(f"Failed to remove session from keyring: {e}")
 
     @staticmethod
     def _retrieve_session(username: str) -> Optional[WSAPISession]:
-        session_json = keyring.get_password(f"{KEYRING_SERVICE}.{username}", "session")
+        session_json = session_cache.get(f"{KEYRING_SERVICE}.{username}", "session")
         if session_json:
             return WSAPISession.from_json(session_json)
         return None
@@ -90,9 +143,14 @@ class WealthsimpleService:
         self, db: Session, username: str, ensure_valid_token: bool = True
     ) -> WealthsimpleAPI:
         """
-        Get WealthsimpleAPI object from stored session. Validates/refreshes token if requested.
+        Get WealthsimpleAPI object for the user, reusing the pooled client until
+        shortly before its token expires. Otherwise builds one from the stored
+        session, which validates/refreshes the token.
         Cleans up invalid sessions to prevent future failures with the same invalid session.
         """
+        return wealthsimple_clients.get(username, lambda: self._build_api(username))
+
+    def _build_api(self, username: str) -> WealthsimpleAPI:
         sess = self._retrieve_session(username)
         if not sess:
             logger.info(
@@ -144,6 +202,53 @@ class WealthsimpleService:
             logger.exception("Error fetching account balances from Wealthsimple")
             raise e
 
+    async def fan_out_accounts(
+        self, account_ids: List[str], fetch: Callable[[str], Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run the blocking `fetch(account_id)` for every account concurrently.
+
+        At most WEALTHSIMPLE_FANOUT_CONCURRENCY calls are in flight. A failing
+        account is reported under "errors" instead of failing the batch.
+        """
+
+        async def fetch_one(account_id: str):
+            try:
+                return True, await wealthsimple_executor.run(fetch, account_id)
+            except Exception as e:
+                return False, str(e)
+
+        payload = {"accounts": {}, "errors": {}}
+        fetcher = OrderedFetcher(
+            fetch_one, concurrency=settings.WEALTHSIMPLE_FANOUT_CONCURRENCY
+        )
+        async for account_id, (ok, result) in fetcher.iter_results(
+            dict.fromkeys(account_ids)
+        ):
+            payload["accounts" if ok else "errors"][account_id] = result
+        return payload
+
+    async def get_accounts_balances(
+        self, db: Session, username: str, account_ids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        return await self.fan_out_accounts(
+            account_ids,
+            lambda account_id: self.get_account_balances(db, username, account_id),
+        )
+
+    async def get_accounts_historical_financials(
+        self,
+        db: Session,
+        username: str,
+        account_ids: List[str],
+        currency: str = "CAD",
+    ) -> Dict[str, Dict[str, Any]]:
+        return await self.fan_out_accounts(
+            account_ids,
+            lambda account_id: self.get_account_historical_financials(
+                db, username, account_id, currency
+            ),
+        )
+
     def get_activities(
         self, db: Session, username: str, account_id: str, how_many: int = 50
     ) -> List[Dict[str, Any]]:
@@ -205,6 +310,32 @@ class WealthsimpleService:
             logger.exception("Error fetching security market data from Wealthsimple")
             raise e
 
+    async def cached_search_security(
+        self, db: Session, username: str, query: str
+    ) -> List[Dict[str, Any]]:
+        """
+        search_security behind a shared TTL cache keyed by the normalized query.
+        """
+        return await security_search_cache.get_or_load(
+            " ".join(query.lower().split()),
+            lambda: wealthsimple_executor.run(
+                self.search_security, db, username, query
+            ),
+        )
+
+    async def cached_security_market_data(
+        self, db: Session, username: str, security_id: str
+    ) -> Dict[str, Any]:
+        """
+        get_security_market_data behind a short-lived shared TTL cache.
+        """
+        return await security_quote_cache.get_or_load(
+            security_id,
+            lambda: wealthsimple_executor.run(
+                self.get_security_market_data, db, username, security_id
+            ),
+        )
+
     def get_account_historical_financials(
         self, db: Session, username: str, account_id: str, currency: str = "CAD"
     ) -> List[Dict[str, Any]]:
@@ -220,6 +351,312 @@ class WealthsimpleService:
             )
             raise e
 
+    @staticmethod
+    def build_account_row(account: dict) -> dict:
+        """Wealthsimple account in the shape AccountRepository.save_accounts takes.
+
+        Activities reference the account by its Wealthsimple id, so that is the
+        account number we store.
+        """
+        unified_type = account.get("unifiedAccountType") or ""
+        account_type = next(
+            (t.value for t in AccountType if t.value in unified_type),
+            unified_type[:20] or None,
+        )
+        return {
+            "number": account["id"],
+            "type": account_type,
+            "status": account.get("status"),
+            "currency": account.get("currency"),
+        }
+
+    @staticmethod
+    def is_storable_feed_item(item: dict) -> bool:
+        status = (item.get("status") or "").lower()
+        return (
+            bool(item.get("canonicalId"))
+            and (item.get("type") or "").upper() != "LEGACY_TRANSFER"
+            and not any(excluded in status for excluded in EXCLUDED_FEED_STATUSES)
+        )
+
+    @staticmethod
+    def fetch_activity_page(
+        api: WealthsimpleAPI, account_ids: List[str], cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One page of the activity feed, newest first, with its pageInfo."""
+        return api.do_graphql_query(
+            "FetchActivityFeedItems",
+            {
+                "orderBy": "OCCURRED_AT_DESC",
+                "first": settings.WEALTHSIMPLE_ACTIVITY_PAGE_SIZE,
+                "cursor": cursor,
+                "condition": {"accountIds": account_ids},
+            },
+            "activityFeedItems",
+            "object",
+        )
+
+    async def save_feed_items(
+        self,
+        db: AsyncSession,
+        items: List[Dict[str, Any]],
+        security_ids: Dict[str, Optional[str]],
+        counts: Dict[str, int],
+    ) -> None:
+        """Persist one page of feed items and any securities they introduce.
+
+        `security_ids` maps Wealthsimple security ids to the id stored in the
+        securities table for this run. Symbols are unique there, so a security
+        whose symbol is already stored (e.g. from Questrade) reuses that row.
+        """
+        items = [item for item in items if self.is_storable_feed_item(item)]
+
+        unseen = {
+            item["securityId"] for item in items if item.get("securityId")
+        } - security_ids.keys()
+        if unseen:
+            known = await self.security_repo.get_known_security_ids(db, unseen)
+            security_ids.update({security_id: security_id for security_id in known})
+
+            new_items = {}
+            for item in items:
+                if item.get("securityId") in unseen - known:
+                    new_items.setdefault(item["securityId"], item)
+            taken = await self.security_repo.get_ids_by_symbols(
+                db, filter(None, map(get_feed_item_symbol, new_items.values()))
+            )
+
+            securities = []
+            for security_id, item in new_items.items():
+                symbol = get_feed_item_symbol(item)
+                if symbol is None:
+                    security_ids[security_id] = None
+                elif symbol in taken:
+                    security_ids[security_id] = taken[symbol]
+                else:
+                    securities.append(build_feed_security(item))
+                    security_ids[security_id] = taken[symbol] = security_id
+            if securities:
+                saved = await self.security_repo.save_securities(db, securities)
+                counts["security_count"] += len(saved)
+
+        activities = build_feed_activity_rows(items, security_ids)
+        if activities:
+            saved = await self.activity_repo.save_activities(db, activities)
+            counts["activity_count"] += len(saved)
+
+    async def sync_accounts(self, db: AsyncSession, api: WealthsimpleAPI) -> List[str]:
+        """Upsert the user's Wealthsimple accounts and return their ids."""
+        ws_accounts = await wealthsimple_executor.run(api.get_accounts, False)
+        if not ws_accounts:
+            return []
+        await self.account_repo.save_accounts(
+            db,
+            [self.build_account_row(account) for account in ws_accounts],
+            broker="Wealthsimple",
+        )
+        return [account["id"] for account in ws_accounts]
+
+    async def sync_account_activities(
+        self,
+        db: AsyncSession,
+        api: WealthsimpleAPI,
+        account,
+        security_ids: Dict[str, Optional[str]],
+        counts: Dict[str, int],
+        full: bool = False,
+    ) -> None:
+        """Store one account's feed, newest first, down to its high-water mark.
+
+        The mark (`last_activity_synced_at`) only moves once the whole range
+        has been saved: a run that fails part-way has stored its newest pages
+        but not the older ones, so the next run must page past them again.
+        """
+        account_id = str(account.account_number)
+        stop_at = None if full else account.last_activity_synced_at
+        started_at = utc_now()
+        newest = None
+        cursor = None
+        while True:
+            page = await wealthsimple_executor.run(
+                self.fetch_activity_page, api, [account_id], cursor
+            )
+            counts["page_count"] += 1
+            items = [edge["node"] for edge in page["edges"]]
+            occurred = [to_utc_datetime(item["occurredAt"]) for item in items]
+            newest = max(filter(None, (newest, *occurred)), default=None)
+
+            reached_stored = False
+            if stop_at is not None:
+                fresh = [
+                    item
+                    for item, occurred_at in zip(items, occurred)
+                    if occurred_at >= stop_at
+                ]
+                reached_stored = len(fresh) < len(items)
+                items = fresh
+
+            await self.save_feed_items(db, items, security_ids, counts)
+
+            page_info = page.get("pageInfo") or {}
+            if reached_stored or not page_info.get("hasNextPage"):
+                break
+            cursor = page_info["endCursor"]
+
+        await self.account_repo.update_account(
+            db,
+            account_id,
+            {
+                "last_activity_synced_at": max(
+                    filter(None, (newest, account.last_activity_synced_at)),
+                    default=started_at,
+                )
+            },
+        )
+
+    async def sync_activities(
+        self, db: AsyncSession, username: str, full: bool = False
+    ) -> Dict[str, int]:
+        """Store the user's Wealthsimple activity feed in the activities table.
+
+        Each account is synced down to its own high-water mark, so an account
+        added later still gets its full history. `full` ignores the marks.
+        """
+        api = await wealthsimple_executor.run(self.get_api, db, username)
+        account_ids = set(await self.sync_accounts(db, api))
+        counts = {"security_count": 0, "activity_count": 0, "page_count": 0}
+        if not account_ids:
+            return counts
+
+        accounts = [
+            account
+            for account in await self.account_repo.get_accounts_by_broker_name(
+                db, "Wealthsimple"
+            )
+            if str(account.account_number) in account_ids
+        ]
+        security_ids = {}
+        for account in accounts:
+            await self.sync_account_activities(
+                db, api, account, security_ids, counts, full=full
+            )
+
+        logger.info(f"Wealthsimple activity sync for {username}: {counts}")
+        return counts
+
+    @staticmethod
+    def fetch_financials_page(
+        api: WealthsimpleAPI,
+        account_id: str,
+        currency: str,
+        start_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """One page of an account's daily financials, oldest first."""
+        return api.do_graphql_query(
+            "FetchAccountHistoricalFinancials",
+            {
+                "id": account_id,
+                "currency": currency,
+                "startDate": start_date.isoformat() if start_date else None,
+                "endDate": None,
+                "resolution": settings.WEALTHSIMPLE_FINANCIALS_RESOLUTION,
+                "first": settings.WEALTHSIMPLE_FINANCIALS_PAGE_SIZE,
+                "cursor": cursor,
+            },
+            "account.financials.historicalDaily",
+            "object",
+        )
+
+    @staticmethod
+    def build_financial_point(account_id: str, currency: str, node: dict) -> dict:
+        deposits = node.get("netDepositsV2") or {}
+        return {
+            "account_id": account_id,
+            "currency": currency,
+            "date": date.fromisoformat(node["date"][:10]),
+            "net_value": Decimal(str(node["netLiquidationValueV2"]["amount"])),
+            "net_deposits": (
+                Decimal(str(deposits["amount"]))
+                if deposits.get("amount") is not None
+                else None
+            ),
+        }
+
+    async def sync_historical_financials(
+        self, db: AsyncSession, username: str, currency: str = "CAD"
+    ) -> Dict[str, int]:
+        """Store each account's daily net value and net deposits.
+
+        Each account is fetched from its newest stored day onwards (that day is
+        re-fetched, since it may have been stored mid-day), so only the first
+        sync pulls the full history.
+        """
+        api = await wealthsimple_executor.run(self.get_api, db, username)
+        account_ids = await self.sync_accounts(db, api)
+        latest = await self.financials_repo.get_latest_dates(db, account_ids, currency)
+
+        counts = {"point_count": 0, "page_count": 0}
+        for account_id in account_ids:
+            cursor = None
+            while True:
+                page = await wealthsimple_executor.run(
+                    self.fetch_financials_page,
+                    api,
+                    account_id,
+                    currency,
+                    latest.get(account_id),
+                    cursor,
+                )
+                counts["page_count"] += 1
+                points = [
+                    self.build_financial_point(account_id, currency, edge["node"])
+                    for edge in page["edges"]
+                    if edge["node"].get("netLiquidationValueV2")
+                ]
+                counts["point_count"] += await self.financials_repo.save_points(
+                    db, points
+                )
+                page_info = page.get("pageInfo") or {}
+                if not page_info.get("hasNextPage"):
+                    break
+                cursor = page_info["endCursor"]
+
+        logger.info(f"Wealthsimple financials sync for {username}: {counts}")
+        return counts
+
+    async def get_financials_series(
+        self,
+        db: AsyncSession,
+        account_ids: List[str],
+        currency: str = "CAD",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        points: Optional[int] = None,
+        period: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Stored daily financials for a date range, summed across accounts.
+
+        `period` keeps the last value of each day/week/month/quarter/year;
+        `points` then caps the series with LTTB on net value.
+        """
+        rows = await self.financials_repo.get_range(
+            db, account_ids, currency, start, end
+        )
+        if period:
+            rows = last_per_period(rows, period, day=lambda row: row[0])
+        if points:
+            rows = lttb(
+                rows,
+                points,
+                x=lambda row: row[0].toordinal(),
+                y=lambda row: float(row[1]),
+            )
+        return [
+            {"date": day, "net_value": net_value, "net_deposits": net_deposits}
+            for day, net_value, net_deposits in rows
+        ]
+
     # Add more methods as needed...
 
 
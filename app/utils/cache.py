@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class AsyncTTLCache:
+    """In-process TTL cache for async lookups that coalesces concurrent misses.
+
+    Concurrent `get_or_load` calls for the same key share one upstream call;
+    failures are not cached. Entries are weighed with `weigh` (1 per entry by
+    default) and the least recently used ones are evicted once the total
+    weight exceeds `max_weight`.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_weight: int,
+        weigh: Callable[[Any], int] = lambda value: 1,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _get_fresh(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at, weight = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, weight = self._entries.pop(key)
+        self._weight -= weight
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        weight = self.weigh(value)
+        if weight > self.max_weight:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, weight)
+        self._weight += weight
+        while self._weight > self.max_weight:
+            self._remove(next(iter(self._entries)))
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        try:
+            value = await loader()
+            self._store(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        found, value = self._get_fresh(key)
+        if found:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._inflight[key] = asyncio.create_task(self._load(key, loader))
+        else:
+            self.coalesced += 1
+        # A cancelled caller must not cancel the load other callers wait on.
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "weight": self._weight,
+            "max_weight": self.max_weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
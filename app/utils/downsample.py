@@ -0,0 +1,69 @@
+from datetime import date
+from typing import Callable, Dict, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+PERIOD_KEYS: Dict[str, Callable[[date], tuple]] = {
+    "day": lambda d: (d.year, d.month, d.day),
+    "week": lambda d: tuple(d.isocalendar()[:2]),
+    "month": lambda d: (d.year, d.month),
+    "quarter": lambda d: (d.year, (d.month - 1) // 3),
+    "year": lambda d: (d.year,),
+}
+
+
+def lttb(
+    rows: Sequence[T],
+    threshold: int,
+    x: Callable[[T], float],
+    y: Callable[[T], float],
+) -> List[T]:
+    """Largest-Triangle-Three-Buckets downsampling to at most `threshold` rows.
+
+    Keeps the first and last rows and, from each bucket in between, the row
+    forming the largest triangle with the previous pick and the next bucket's
+    average, which preserves the visual shape of the series.
+    """
+    n = len(rows)
+    if threshold >= n or threshold < 3:
+        return list(rows)
+
+    xs = [x(row) for row in rows]
+    ys = [y(row) for row in rows]
+    sampled = [rows[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        span = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / span
+        avg_y = sum(ys[avg_start:avg_end]) / span
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(rows[best])
+        a = best
+    sampled.append(rows[-1])
+    return sampled
+
+
+def last_per_period(
+    rows: Sequence[T], period: str, day: Callable[[T], date]
+) -> List[T]:
+    """Last row of each calendar period, for rows ordered by date."""
+    key = PERIOD_KEYS[period]
+    sampled = []
+    previous = None
+    for row in rows:
+        current = key(day(row))
+        if sampled and current == previous:
+            sampled[-1] = row
+        else:
+            sampled.append(row)
+        previous = current
+    return sampled
@@ -0,0 +1,23 @@
+import csv
+import io
+from typing import List, Sequence
+
+import orjson
+
+
+def encode_ndjson(rows: Sequence, columns: List[str]) -> bytes:
+    return b"".join(
+        orjson.dumps({column: row[column] for column in columns}, default=str) + b"\n"
+        for row in rows
+    )
+
+
+def encode_csv_header(columns: List[str]) -> bytes:
+    return encode_csv([dict(zip(columns, columns))], columns)
+
+
+def encode_csv(rows: Sequence, columns: List[str]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([row[column] for column in columns] for row in rows)
+    return buffer.getvalue().encode()
@@ -0,0 +1,99 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+R = TypeVar("R")
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class MeteredExecutor:
+    """Dedicated thread pool for blocking calls, with queue and latency metrics.
+
+    Keeps one integration's blocking I/O off Starlette's shared threadpool, so
+    a burst of slow calls only queues behind itself. `queued` is the number of
+    calls waiting for a free worker; wait and run latencies are kept for the
+    most recent `sample_size` calls.
+    """
+
+    def __init__(self, name: str, max_workers: int, sample_size: int = 1024):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_times = deque(maxlen=sample_size)
+        self._run_times = deque(maxlen=sample_size)
+
+    def _call(self, submitted_at: float, fn: Callable[[], R]) -> R:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_times.append(started_at - submitted_at)
+        failed = False
+        try:
+            return fn()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._failed += failed
+                self._run_times.append(time.perf_counter() - started_at)
+
+    async def run(self, fn: Callable[..., R], *args, **kwargs) -> R:
+        call = functools.partial(
+            contextvars.copy_context().run, functools.partial(fn, *args, **kwargs)
+        )
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(self._call, time.perf_counter(), call)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Still queued: drop it rather than run it for nobody.
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def metrics(self) -> dict:
+        with self._lock:
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+            counters = {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+        return {
+            **counters,
+            "wait_ms_p50": round(_percentile(wait_times, 0.5) * 1000, 2),
+            "wait_ms_p95": round(_percentile(wait_times, 0.95) * 1000, 2),
+            "run_ms_p50": round(_percentile(run_times, 0.5) * 1000, 2),
+            "run_ms_p95": round(_percentile(run_times, 0.95) * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
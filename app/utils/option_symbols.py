@@ -0,0 +1,83 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Questrade: AAPL17Jan25C150.00 (underlying, day, month, year, right, strike)
+QUESTRADE_OPTION_PATTERN = re.compile(
+    r"^(?P<underlying>[A-Z0-9.\-]+?)"
+    r"(?P<day>\d{1,2})(?P<month>[A-Za-z]{3})(?P<year>\d{2})"
+    r"(?P<right>[CP])(?P<strike>\d+(?:\.\d+)?)$"
+)
+
+# Wealthsimple uses OCC symbols: AAPL  250117C00150000, strike in thousandths
+OCC_OPTION_PATTERN = re.compile(
+    r"^(?P<underlying>[A-Z0-9.\-]{1,6})\s*"
+    r"(?P<year>\d{2})(?P<month>\d{2})(?P<day>\d{2})"
+    r"(?P<right>[CP])(?P<strike>\d{8})$"
+)
+
+OPTION_RIGHTS = {"C": "Call", "P": "Put"}
+
+
+class OptionSymbol(NamedTuple):
+    underlying: str
+    expiry: date
+    strike: Decimal
+    right: str
+
+
+def _parse_questrade(match: re.Match) -> OptionSymbol:
+    expiry = datetime.strptime(
+        f"{match['day']}{match['month'].title()}{match['year']}", "%d%b%y"
+    ).date()
+    return OptionSymbol(
+        underlying=match["underlying"],
+        expiry=expiry,
+        strike=Decimal(match["strike"]),
+        right=OPTION_RIGHTS[match["right"]],
+    )
+
+
+def _parse_occ(match: re.Match) -> OptionSymbol:
+    expiry = date(2000 + int(match["year"]), int(match["month"]), int(match["day"]))
+    return OptionSymbol(
+        underlying=match["underlying"],
+        expiry=expiry,
+        strike=Decimal(match["strike"]) / 1000,
+        right=OPTION_RIGHTS[match["right"]],
+    )
+
+
+@lru_cache(maxsize=4096)
+def parse_option_symbol(symbol: Optional[str]) -> Optional[OptionSymbol]:
+    """Split a Questrade or Wealthsimple (OCC) option symbol into its parts.
+
+    Returns None for anything that is not an option symbol, including equities
+    and symbols whose date part is not a real calendar date.
+    """
+    if not symbol:
+        return None
+    symbol = symbol.strip().upper()
+    for pattern, parse in (
+        (QUESTRADE_OPTION_PATTERN, _parse_questrade),
+        (OCC_OPTION_PATTERN, _parse_occ),
+    ):
+        if match := pattern.match(symbol):
+            try:
+                return parse(match)
+            except ValueError:
+                return None
+    return None
+
+
+def option_columns(symbol: Optional[str]) -> dict:
+    """Security column values for `symbol`; all None when it is not an option."""
+    parsed = parse_option_symbol(symbol)
+    return {
+        "underlying_symbol": parsed.underlying if parsed else None,
+        "option_expiry": parsed.expiry if parsed else None,
+        "option_strike": parsed.strike if parsed else None,
+        "option_right": parsed.right if parsed else None,
+    }
@@ -0,0 +1,77 @@
+import asyncio
+from collections import deque
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from app.utils.rate_limiter import RateLimiter
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class OrderedFetcher:
+    """Run fetch tasks concurrently and yield their results in submission order.
+
+    At most `concurrency` fetches are in flight at once and every fetch first
+    waits on the shared rate limiter. Only a bounded number of tasks is scheduled
+    ahead of the one being yielded, so results never pile up in memory while an
+    early task is slow.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[T], Awaitable[R]],
+        concurrency: int,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.fetch = fetch
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+
+    async def _run_one(self, semaphore: asyncio.Semaphore, task: T) -> R:
+        async with semaphore:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            return await self.fetch(task)
+
+    async def iter_results(self, tasks: Iterable[T]) -> AsyncIterator[Tuple[T, R]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        remaining = iter(tasks)
+        max_scheduled = self.concurrency * 2
+        scheduled = deque()
+
+        def schedule_next() -> None:
+            task = next(remaining, _EXHAUSTED)
+            if task is not _EXHAUSTED:
+                scheduled.append(
+                    (task, asyncio.create_task(self._run_one(semaphore, task)))
+                )
+
+        try:
+            for _ in range(max_scheduled):
+                schedule_next()
+
+            while scheduled:
+                task, future = scheduled.popleft()
+                result = await future
+                schedule_next()
+                yield task, result
+        finally:
+            for _, future in scheduled:
+                future.cancel()
+            if scheduled:
+                await asyncio.gather(
+                    *(future for _, future in scheduled), return_exceptions=True
+                )
+
+
+_EXHAUSTED = object()
@@ -0,0 +1,26 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+import orjson
+
+from app.errors import InvalidCursorError
+
+
+def encode_cursor(filled_at: Optional[datetime], activity_id: str) -> str:
+    """Opaque keyset cursor for the (filled_at, id) position of a row."""
+    payload = orjson.dumps([filled_at.isoformat() if filled_at else None, activity_id])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        filled_at, activity_id = orjson.loads(base64.urlsafe_b64decode(padded))
+        return (
+            datetime.fromisoformat(filled_at) if filled_at else None,
+            str(activity_id),
+        )
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError() from e
@@ -0,0 +1,42 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Tuple
+
+
+class RateLimiter:
+    """Sliding-window limiter enforcing several (max_calls, period_seconds) limits.
+
+    Every call to `acquire` counts against all limits, so a limiter built with
+    [(30, 1), (30000, 3600)] keeps callers under both the per-second and the
+    per-hour budget. `clock` and `sleep` default to the monotonic clock and
+    asyncio.sleep.
+    """
+
+    def __init__(
+        self,
+        limits: Iterable[Tuple[int, float]],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self._limits = [(max_calls, period, deque()) for max_calls, period in limits]
+        self._lock = asyncio.Lock()
+        self._clock = clock
+        self._sleep = sleep
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = self._clock()
+                wait = 0.0
+                for max_calls, period, calls in self._limits:
+                    while calls and now - calls[0] >= period:
+                        calls.popleft()
+                    if len(calls) >= max_calls:
+                        wait = max(wait, period - (now - calls[0]))
+                if wait <= 0:
+                    break
+                await self._sleep(wait)
+
+            for _, _, calls in self._limits:
+                calls.append(now)
@@ -1,8 +1,12 @@
 import redis
+import redis.asyncio
 import json
 from typing import Optional
 
 redis_client = redis.Redis(host="localhost", port=6379, db=0, decode_responses=True)
+async_redis_client = redis.asyncio.Redis(
+    host="localhost", port=6379, db=0, decode_responses=True
+)
 
 
 def get_from_redis(key: str) -> Optional[dict]:
@@ -0,0 +1,82 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+import keyring
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.utils.redis import redis_client
+
+
+class KeyringSessionCache:
+    """In-process cache in front of keyring.
+
+    Keyring stays the durable store; reads are served from memory while the
+    entry's version matches a per-entry Redis counter, so the hot path costs
+    one Redis GET instead of a Secret Service round-trip. Writes and deletes
+    go to keyring and then bump the counter, so every worker drops its copy
+    on its next read. If Redis is unreachable, reads go straight to keyring.
+    """
+
+    def __init__(self, version_key_prefix: str = "keyring:version"):
+        self.version_key_prefix = version_key_prefix
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[str], str]] = {}
+        self._lock = threading.Lock()
+
+    def _version_key(self, service: str, username: str) -> str:
+        return f"{self.version_key_prefix}:{service}:{username}"
+
+    def _current_version(self, service: str, username: str) -> Optional[str]:
+        try:
+            return redis_client.get(self._version_key(service, username)) or "0"
+        except RedisError as e:
+            logger.warning(f"Keyring cache version check failed: {e}")
+            return None
+
+    def _bump_version(self, service: str, username: str) -> Optional[str]:
+        try:
+            return str(redis_client.incr(self._version_key(service, username)))
+        except RedisError as e:
+            logger.warning(f"Keyring cache version bump failed: {e}")
+            return None
+
+    def get(self, service: str, username: str) -> Optional[str]:
+        key = (service, username)
+        version = self._current_version(service, username)
+        if version is None:
+            with self._lock:
+                self._entries.pop(key, None)
+            return keyring.get_password(service, username)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[1] == version:
+            return entry[0]
+
+        # Read after the version: a concurrent write bumps it afterwards, so a
+        # stale value cached here is replaced on the next read.
+        value = keyring.get_password(service, username)
+        with self._lock:
+            self._entries[key] = (value, version)
+        return value
+
+    def set(self, service: str, username: str, value: str) -> None:
+        keyring.set_password(service, username, value)
+        self._invalidate(service, username)
+
+    def delete(self, service: str, username: str) -> None:
+        try:
+            keyring.delete_password(service, username)
+        finally:
+            self._invalidate(service, username)
+
+    def _invalidate(self, service: str, username: str) -> None:
+        # The local copy is dropped rather than replaced: with two workers
+        # writing at once, the last version bump need not belong to the last
+        # keyring write, so the next read re-fetches the winner.
+        self._bump_version(service, username)
+        with self._lock:
+            self._entries.pop((service, username), None)
+
+
+session_cache = KeyringSessionCache()
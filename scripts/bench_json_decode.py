@@ -0,0 +1,82 @@
+"""Compare the requestor's Box decode path with the plain orjson path.
+
+Usage:
+    python scripts/bench_json_decode.py [recorded_response.json ...]
+
+Without arguments a synthetic activities payload of the legacy API's shape is
+used. Pass recorded response bodies to measure real payloads instead.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import orjson
+from box import Box
+
+
+def synthetic_activities(count: int = 20000) -> bytes:
+    start = datetime(2020, 1, 1)
+    results = [
+        {
+            "id": f"custodian_account_activity-{i}",
+            "account_id": f"tfsa-{i % 4}",
+            "object": "activity",
+            "type": ("buy", "sell", "dividend", "deposit")[i % 4],
+            "symbol": f"SYM{i % 500}",
+            "security_id": f"sec-s-{i % 500}",
+            "quantity": i % 37,
+            "market_value": {"amount": i * 1.37, "currency": "CAD"},
+            "net_cash": {"amount": -i * 1.37, "currency": "CAD"},
+            "effective_date": (start + timedelta(hours=i)).isoformat(),
+            "process_date": (start + timedelta(hours=i)).date().isoformat(),
+            "description": "Recorded activity payload entry",
+            "meta": {"tags": ["a", "b"], "source": {"channel": "web"}},
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"results": results, "offset": 0, "total_count": count}).encode()
+
+
+def box_decode(content: bytes):
+    return Box(json.loads(content))
+
+
+def plain_decode(content: bytes):
+    return orjson.loads(content)
+
+
+def measure(decode, content: bytes, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(content)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    decode(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def main(paths):
+    payloads = (
+        [(path, Path(path).read_bytes()) for path in paths]
+        if paths
+        else [("synthetic activities", synthetic_activities())]
+    )
+    for name, content in payloads:
+        print(f"{name}: {len(content) / 1024:.0f} KiB")
+        results = {}
+        for label, decode in (("box", box_decode), ("orjson", plain_decode)):
+            best, peak = measure(decode, content, repeat=5)
+            results[label] = best
+            print(f"  {label:>6}: {best * 1000:8.1f} ms  peak {peak / 2**20:6.1f} MiB")
+        print(f"  speedup: {results['box'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
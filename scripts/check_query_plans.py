@@ -0,0 +1,203 @@
+"""Flag repository queries that the planner can only answer with a Seq Scan.
+
+Usage:
+    python scripts/check_query_plans.py
+
+Each repository method below runs against a recording session, which
+captures the SQL it would send without executing anything. The statements
+are then EXPLAINed against DATABASE_URL with enable_seqscan off: a Seq Scan
+that still shows up means no index can serve the query. Run it against a
+database at `alembic upgrade head`; it exits with status 1 on any finding.
+"""
+
+import asyncio
+import sys
+from datetime import date, datetime, timezone
+
+import orjson
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.repositories.account_respository import AccountRepository
+from app.repositories.activity_repository import ActivityRepository
+from app.repositories.backfill_repository import BackfillRepository
+from app.repositories.financials_repository import FinancialsRepository
+from app.repositories.security_repository import SecurityRepository
+from config.settings import settings
+
+ACCOUNTS = ["TFSA-1", "RRSP-1"]
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class _Anything:
+    """Stands in for rows and ORM objects so callers run to completion."""
+
+    def __getattr__(self, name):
+        return None
+
+
+class _NoRows:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def __iter__(self):
+        return iter(())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+    def all(self):
+        return []
+
+    def first(self):
+        return _Anything()
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return _NoRows()
+
+    async def stream(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return _NoRows()
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def repository_calls():
+    activities = ActivityRepository()
+    backfill = BackfillRepository()
+    return {
+        "activities.page": lambda db: activities.get_page(db, ["id"], 100),
+        "activities.page_after": lambda db: activities.get_page(
+            db, ["id"], 100, after=(START, "activity-1")
+        ),
+        "activities.page_accounts": lambda db: activities.get_page(
+            db, ["id"], 100, account_ids=ACCOUNTS, start=START, end=END
+        ),
+        "activities.page_types": lambda db: activities.get_page(
+            db, ["id"], 100, types=["Order"], account_ids=ACCOUNTS
+        ),
+        "activities.page_symbol": lambda db: activities.get_page(
+            db, ["id"], 100, symbol="VFV"
+        ),
+        "activities.page_security": lambda db: activities.get_page(
+            db, ["id"], 100, security_id="sec-s-1"
+        ),
+        "activities.export": lambda db: _drain(
+            activities.stream_rows(db, ["id"], 1000, account_ids=ACCOUNTS)
+        ),
+        "activities.dividends": lambda db: activities.aggregate_dividends(
+            db, account_ids=ACCOUNTS, group_by=("period",)
+        ),
+        "activities.dividends_all": lambda db: activities.aggregate_dividends(db),
+        "activities.commissions": lambda db: activities.aggregate_commissions(
+            db, account_ids=ACCOUNTS, start=START
+        ),
+        "activities.commissions_all": lambda db: activities.aggregate_commissions(
+            db, group_by=("account",)
+        ),
+        "activities.trades": lambda db: activities.aggregate_trades(
+            db, account_ids=ACCOUNTS
+        ),
+        "accounts.by_id": lambda db: AccountRepository.get_account_by_id(
+            db, ACCOUNTS[0]
+        ),
+        "accounts.by_broker": lambda db: AccountRepository.get_accounts_by_broker_name(
+            db, "Questrade"
+        ),
+        "securities.known_ids": lambda db: SecurityRepository().get_known_security_ids(
+            db, ["sec-s-1"]
+        ),
+        "securities.by_symbols": lambda db: SecurityRepository.get_ids_by_symbols(
+            db, ["VFV", "XEQT"]
+        ),
+        "securities.options": lambda db: SecurityRepository().get_options_by_underlying(
+            db, "AAPL", date(2025, 1, 1), date(2025, 6, 30)
+        ),
+        "backfill.claim_job": lambda db: backfill.claim_job(db, "job-1"),
+        "backfill.touch": lambda db: backfill.touch_job(db, "job-1"),
+        "backfill.resumable": lambda db: backfill.get_resumable_job_ids(db),
+        "backfill.pending": lambda db: backfill.get_pending_checkpoints(db, "job-1"),
+        "backfill.newest_settled": lambda db: backfill.get_newest_settled_at(
+            db, "job-1", ACCOUNTS[0]
+        ),
+        "backfill.progress": lambda db: backfill.get_job_progress(db, "job-1"),
+        "backfill.account_ids": lambda db: backfill.get_account_ids(db, "job-1"),
+        "backfill.skip": lambda db: backfill.skip_checkpoints(db, "job-1", ACCOUNTS),
+        "financials.latest_dates": lambda db: FinancialsRepository.get_latest_dates(
+            db, ACCOUNTS, "CAD"
+        ),
+        "financials.range": lambda db: FinancialsRepository.get_range(
+            db, ACCOUNTS, "CAD", date(2024, 1, 1), date(2024, 12, 31)
+        ),
+    }
+
+
+async def _drain(rows):
+    async for _ in rows:
+        pass
+
+
+async def record(call):
+    db = RecordingSession()
+    await call(db)
+    return [
+        str(
+            statement.compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"literal_binds": True},
+            )
+        )
+        for statement in db.statements
+    ]
+
+
+def seq_scans(plan: dict):
+    if plan["Node Type"] == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from seq_scans(child)
+
+
+async def main() -> int:
+    engine = create_async_engine(settings.DATABASE_URL)
+    findings = 0
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            for name, call in repository_calls().items():
+                for sql in await record(call):
+                    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+                    plan = result.scalar_one()
+                    if isinstance(plan, str):
+                        plan = orjson.loads(plan)
+                    tables = sorted(set(seq_scans(plan[0]["Plan"])))
+                    print(f"{'SEQ SCAN' if tables else 'ok':>8}  {name}", *tables)
+                    if tables:
+                        findings += 1
+                        print(f"          {sql}")
+            # EXPLAIN does not execute, but keep the session side-effect free.
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,16 @@
+import pytest
+from fastapi import HTTPException
+
+from app.dependencies import get_account_ids
+
+
+def test_account_ids_are_stripped_and_deduplicated():
+    assert get_account_ids("tfsa-1, rrsp-1,,tfsa-1,") == ["tfsa-1", "rrsp-1"]
+
+
+@pytest.mark.parametrize("account_ids", ["", ",", " , "])
+def test_no_account_ids_is_rejected(account_ids):
+    with pytest.raises(HTTPException) as e:
+        get_account_ids(account_ids)
+
+    assert e.value.status_code == 422
@@ -0,0 +1,42 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.activity_repository import ActivityRepository
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def mappings(self):
+        return []
+
+
+def compiled(call) -> str:
+    db = RecordingSession()
+    asyncio.run(call(db))
+    (statement,) = db.statements
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_commissions_count_fees_of_either_sign():
+    sql = compiled(lambda db: ActivityRepository().aggregate_commissions(db))
+
+    # Questrade commissions are negative, Wealthsimple fees positive.
+    assert "abs(activities.commission)" in sql
+    assert "activities.commission != 0" in sql
+
+
+def test_summary_groups_by_output_name():
+    sql = compiled(
+        lambda db: ActivityRepository().aggregate_trades(
+            db, group_by=("account", "period"), period="year"
+        )
+    )
+
+    assert "GROUP BY account_id, period" in sql
@@ -0,0 +1,42 @@
+import asyncio
+
+from app.dependencies import get_activity_filters
+from app.repositories.activity_repository import ActivityRepository
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def mappings(self):
+        return []
+
+
+def test_comma_separated_filters_drop_empty_items():
+    filters = get_activity_filters(account_ids="tfsa-1,,rrsp-1,", type="Order")
+
+    assert filters["account_ids"] == ["tfsa-1", "rrsp-1"]
+    assert filters["types"] == ["Order"]
+
+
+def test_empty_filters_are_unset():
+    filters = get_activity_filters(account_ids="", type=",")
+
+    assert filters["account_ids"] is None
+    assert filters["types"] is None
+
+
+def test_aggregates_take_every_activity_filter():
+    db = RecordingSession()
+    filters = get_activity_filters(account_ids="tfsa-1", symbol="VFV")
+
+    asyncio.run(ActivityRepository().aggregate_dividends(db, **filters))
+
+    (statement,) = db.statements
+    sql = str(statement)
+    assert "activities.account_id IN" in sql
+    assert "activities.symbol =" in sql
@@ -0,0 +1,46 @@
+import math
+from datetime import date, timedelta
+
+from app.utils.downsample import last_per_period, lttb
+
+
+def series(n):
+    return [(i, math.sin(i / 10)) for i in range(n)]
+
+
+def sample(rows, threshold):
+    return lttb(rows, threshold, x=lambda row: row[0], y=lambda row: row[1])
+
+
+def test_lttb_keeps_endpoints_within_budget():
+    rows = series(1000)
+
+    sampled = sample(rows, 50)
+
+    assert len(sampled) == 50
+    assert sampled[0] == rows[0]
+    assert sampled[-1] == rows[-1]
+    assert [row[0] for row in sampled] == sorted({row[0] for row in sampled})
+
+
+def test_lttb_keeps_the_peak():
+    rows = [(i, 0.0) for i in range(100)]
+    rows[37] = (37, 10.0)
+
+    assert rows[37] in sample(rows, 10)
+
+
+def test_lttb_leaves_short_series_alone():
+    rows = series(20)
+
+    assert sample(rows, 20) == rows
+    assert sample(rows, 2) == rows
+
+
+def test_last_per_period():
+    days = [date(2024, 1, 30) + timedelta(days=i) for i in range(5)]
+
+    assert last_per_period(days, "month", day=lambda d: d) == [
+        date(2024, 1, 31),
+        date(2024, 2, 3),
+    ]
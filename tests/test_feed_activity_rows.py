@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.services.activity_service import build_feed_activity_rows
+
+
+def feed_item(**fields):
+    item = {
+        "canonicalId": "activity-1",
+        "accountId": "tfsa-1",
+        "type": "DIY_BUY",
+        "currency": "CAD",
+        "status": "FILLED",
+        "occurredAt": "2024-03-01T14:30:00-05:00",
+        "amount": "-101.00",
+        "assetQuantity": "4",
+        "assetSymbol": "VFV",
+        "securityId": "sec-s-vfv",
+    }
+    item.update(fields)
+    return item
+
+
+def test_trade_row():
+    (row,) = build_feed_activity_rows([feed_item()], {"sec-s-vfv": "sec-s-vfv"})
+
+    assert row["type"] == "Order"
+    assert row["action"] == "Buy"
+    assert row["amount"] == Decimal("101.00")
+    assert row["price"] == Decimal("25.25")
+    assert row["filled_at"] == datetime(2024, 3, 1, 19, 30, tzinfo=timezone.utc)
+    assert row["submitted_at"] == row["filled_at"]
+    assert row["security_id"] == "sec-s-vfv"
+
+
+def test_non_trades_have_no_price_and_unknown_types_are_other():
+    rows = build_feed_activity_rows(
+        [
+            feed_item(type="DIVIDEND", assetQuantity=None, amount="3.21"),
+            feed_item(type="SOMETHING_NEW", securityId=None),
+        ],
+        {},
+    )
+
+    assert [(row["type"], row["action"], row["price"]) for row in rows] == [
+        ("Dividend", "Cash Dividend", 0),
+        ("Other", None, 0),
+    ]
+
+
+def test_rows_share_the_same_keys():
+    rows = build_feed_activity_rows(
+        [feed_item(), feed_item(type="DEPOSIT", assetSymbol=None, securityId=None)],
+        {},
+    )
+
+    assert rows[0].keys() == rows[1].keys()
+
+
+def test_security_id_follows_the_stored_security():
+    (row,) = build_feed_activity_rows([feed_item()], {"sec-s-vfv": "questrade-123"})
+
+    assert row["security_id"] == "questrade-123"
+
+
+def test_options_get_their_occ_symbol():
+    item = feed_item(
+        type="OPTIONS_BUY",
+        assetSymbol="AAPL",
+        contractType="CALL",
+        expiryDate="2025-01-17",
+        strikePrice="150",
+    )
+
+    (row,) = build_feed_activity_rows([item], {})
+
+    assert row["type"] == "Option"
+    assert row["symbol"] == "AAPL250117C00150000"
@@ -0,0 +1,42 @@
+from datetime import date
+from decimal import Decimal
+
+from app.utils.option_symbols import OptionSymbol, option_columns, parse_option_symbol
+
+
+def test_questrade_symbol():
+    assert parse_option_symbol("AAPL17Jan25C150.00") == OptionSymbol(
+        "AAPL", date(2025, 1, 17), Decimal("150.00"), "Call"
+    )
+
+
+def test_occ_symbol():
+    assert parse_option_symbol("AAPL  250117P00150500") == OptionSymbol(
+        "AAPL", date(2025, 1, 17), Decimal("150.5"), "Put"
+    )
+
+
+def test_dotted_underlying():
+    assert parse_option_symbol("BRK.B21Mar25C480.00").underlying == "BRK.B"
+    assert parse_option_symbol("BRK.B 250321C00480000").underlying == "BRK.B"
+
+
+def test_equities_are_not_options():
+    assert parse_option_symbol("BRK.B") is None
+    assert parse_option_symbol("VFV.TO") is None
+    assert parse_option_symbol(None) is None
+
+
+def test_invalid_date_is_not_an_option():
+    assert parse_option_symbol("AAPL31Feb25C150.00") is None
+    assert parse_option_symbol("AAPL  250231C00150000") is None
+
+
+def test_option_columns():
+    assert option_columns("AAPL17Jan25C150.00") == {
+        "underlying_symbol": "AAPL",
+        "option_expiry": date(2025, 1, 17),
+        "option_strike": Decimal("150.00"),
+        "option_right": "Call",
+    }
+    assert set(option_columns("AAPL").values()) == {None}
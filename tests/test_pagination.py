@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.controllers import activity_controller
+from app.database.connection import get_db
+from app.errors import InvalidCursorError
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    filled_at = datetime(2024, 3, 1, 14, 30, 15, 250, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor(filled_at, "activity-1")) == (
+        filled_at,
+        "activity-1",
+    )
+
+
+def test_cursor_without_filled_at():
+    assert decode_cursor(encode_cursor(None, "activity-1")) == (None, "activity-1")
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "bm90IGpzb24", "WzFd"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_malformed_cursor_is_a_bad_request():
+    app = FastAPI()
+    app.include_router(activity_controller.router, prefix="/activities")
+    app.dependency_overrides[get_db] = lambda: None
+
+    response = TestClient(app).get("/activities/", params={"cursor": "bm90IGpzb24"})
+
+    assert response.status_code == 400
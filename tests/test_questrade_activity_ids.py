@@ -0,0 +1,48 @@
+import copy
+
+from app.services.questrade_service import QuestradeService
+
+
+def trade(**fields):
+    activity = {
+        "tradeDate": "2024-03-01T00:00:00.000000-05:00",
+        "transactionDate": "2024-03-01T00:00:00.000000-05:00",
+        "settlementDate": "2024-03-05T00:00:00.000000-05:00",
+        "type": "Trades",
+        "action": "Buy",
+        "symbolId": 8049,
+        "quantity": 10,
+        "price": 25.25,
+        "grossAmount": -252.5,
+        "netAmount": -257.45,
+        "commission": -4.95,
+        "currency": "CAD",
+    }
+    activity.update(fields)
+    return activity
+
+
+def ids(activities, account_number="TFSA-1"):
+    activities = copy.deepcopy(activities)
+    QuestradeService.assign_activity_ids(activities, account_number)
+    return [activity["id"] for activity in activities]
+
+
+def test_ids_are_stable_across_refetches():
+    first = [trade(), trade(action="Sell", quantity=-10)]
+
+    assert ids(first) == ids(first)
+    # An overlapping window returns the same row among others.
+    assert ids([trade(symbolId=1), *first])[1:] == ids(first)
+
+
+def test_duplicate_rows_get_distinct_ids():
+    assert len(set(ids([trade(), trade(), trade()]))) == 3
+
+
+def test_ids_depend_on_the_account():
+    assert ids([trade()], "TFSA-1") != ids([trade()], "RRSP-1")
+
+
+def test_existing_ids_are_kept():
+    assert ids([trade(id="given")]) == ["given"]
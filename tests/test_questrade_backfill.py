@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.services.questrade_service import QuestradeService
+
+END_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeBackfillRepository:
+    def __init__(self, checkpoints):
+        self.checkpoints = checkpoints
+
+    async def get_pending_checkpoints(self, db, job_id):
+        return [c for c in self.checkpoints if c.status == "pending"]
+
+    async def get_account_ids(self, db, job_id):
+        return sorted({c.account_id for c in self.checkpoints})
+
+    async def skip_checkpoints(self, db, job_id, account_ids):
+        skipped = [
+            c
+            for c in self.checkpoints
+            if c.account_id in account_ids and c.status == "pending"
+        ]
+        for checkpoint in skipped:
+            checkpoint.status = "skipped"
+        return len(skipped)
+
+    async def complete_checkpoint(self, db, checkpoint, count, newest_settled_at):
+        checkpoint.status = "done"
+
+    async def get_newest_settled_at(self, db, job_id, account_id):
+        return None
+
+
+class FakeAccountRepository:
+    def __init__(self, account_numbers):
+        self.accounts = [
+            SimpleNamespace(account_number=number, last_activity_synced_at=None)
+            for number in account_numbers
+        ]
+        self.updates = {}
+
+    async def get_accounts_by_broker_name(self, db, broker_name):
+        return self.accounts
+
+    async def update_account(self, db, account_id, values):
+        self.updates[account_id] = values
+
+
+def checkpoint(account_id, month, status="pending"):
+    start = datetime(2024, month, 1, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        job_id="job",
+        account_id=account_id,
+        window_start=start,
+        window_end=start + timedelta(days=28),
+        status=status,
+    )
+
+
+def run_job(checkpoints, account_numbers):
+    backfill_repo = FakeBackfillRepository(checkpoints)
+    account_repo = FakeAccountRepository(account_numbers)
+    service = QuestradeService(account_repo=account_repo, backfill_repo=backfill_repo)
+    service._client = object()
+
+    async def fetch_activity_window(window):
+        return []
+
+    service.fetch_activity_window = fetch_activity_window
+    job = SimpleNamespace(id="job", end_time=END_TIME)
+    result = asyncio.run(service.run_backfill_job(None, job))
+    return result, account_repo.updates
+
+
+def test_resume_finishes_accounts_completed_by_an_earlier_run():
+    checkpoints = [
+        checkpoint("A", 1, status="done"),
+        checkpoint("A", 2, status="done"),
+        checkpoint("B", 1, status="done"),
+        checkpoint("B", 2),
+    ]
+
+    result, updates = run_job(checkpoints, ["A", "B"])
+
+    assert set(updates) == {"A", "B"}
+    assert updates["A"] == {"last_activity_synced_at": END_TIME}
+    assert all(c.status == "done" for c in checkpoints)
+    assert result["skipped_window_count"] == 0
+
+
+def test_windows_of_unknown_accounts_are_marked_skipped():
+    checkpoints = [checkpoint("A", 1), checkpoint("GONE", 1), checkpoint("GONE", 2)]
+
+    result, updates = run_job(checkpoints, ["A"])
+
+    assert result["skipped_window_count"] == 2
+    assert [c.status for c in checkpoints] == ["done", "skipped", "skipped"]
+    assert set(updates) == {"A"}
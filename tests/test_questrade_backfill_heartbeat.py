@@ -0,0 +1,61 @@
+import asyncio
+import contextlib
+
+from app.services import questrade_backfill
+from app.services.questrade_backfill import QuestradeBackfillRunner
+
+
+class FakeDb:
+    async def rollback(self):
+        pass
+
+
+class FakeBackfillRepository:
+    def __init__(self):
+        self.touches = 0
+        self.status = None
+
+    async def claim_job(self, db, job_id):
+        return True
+
+    async def get_job(self, db, job_id):
+        return job_id
+
+    async def touch_job(self, db, job_id):
+        self.touches += 1
+
+    async def finish_job(self, db, job_id, status, error=None):
+        self.status = status
+
+
+class SlowService:
+    """A backfill with one window that outlasts several heartbeats."""
+
+    async def run_backfill_job(self, db, job):
+        await asyncio.sleep(0.1)
+        return {}
+
+
+def test_heartbeat_runs_while_a_window_is_in_flight(monkeypatch):
+    monkeypatch.setattr(
+        questrade_backfill.settings, "QUESTRADE_BACKFILL_HEARTBEAT_SECONDS", 0.02
+    )
+    monkeypatch.setattr(
+        questrade_backfill, "sessionLocal", lambda: contextlib.nullcontext(FakeDb())
+    )
+    runner = QuestradeBackfillRunner()
+    runner.backfill_repo = FakeBackfillRepository()
+    runner._build_service = SlowService
+
+    async def run():
+        await runner._run("job-1")
+        touches = runner.backfill_repo.touches
+        await asyncio.sleep(0.05)
+        return touches
+
+    touches = asyncio.run(run())
+
+    assert touches >= 3
+    # The heartbeat stops with the job.
+    assert runner.backfill_repo.touches == touches
+    assert runner.backfill_repo.status == "done"
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.errors import InvalidRefreshTokenError, QuestradeUnauthorizedError
+from app.services import questrade_service
+from app.services.questrade_service import QuestradeService
+
+
+class FakeTokens:
+    def __init__(self):
+        self.refreshes = 0
+
+    async def refresh(self, stale_token=None):
+        self.refreshes += 1
+
+
+class FakeClient:
+    access_token = {"access_token": "stale"}
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def get_accounts(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return []
+
+
+class FakeAccountRepository:
+    async def save_accounts(self, db, accounts, broker):
+        return accounts
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    tokens = FakeTokens()
+    monkeypatch.setattr(questrade_service, "questrade_tokens", tokens)
+    return tokens
+
+
+def sync_accounts(client):
+    service = QuestradeService(account_repo=FakeAccountRepository())
+    service._client = client
+    return asyncio.run(service.sync_accounts(None))
+
+
+def test_unauthorized_refreshes_and_retries_once(tokens):
+    client = FakeClient(QuestradeUnauthorizedError())
+
+    assert sync_accounts(client) == {"count": 0, "saved_accounts": []}
+    assert tokens.refreshes == 1
+    assert client.calls == 2
+
+
+def test_unauthorized_twice_propagates(tokens):
+    client = FakeClient(QuestradeUnauthorizedError(), QuestradeUnauthorizedError())
+
+    with pytest.raises(QuestradeUnauthorizedError):
+        sync_accounts(client)
+    assert tokens.refreshes == 1
+
+
+def test_invalid_refresh_token_propagates_without_refresh(tokens):
+    client = FakeClient(InvalidRefreshTokenError())
+
+    with pytest.raises(InvalidRefreshTokenError):
+        sync_accounts(client)
+    assert tokens.refreshes == 0
+
+
+def test_other_errors_mentioning_401_do_not_refresh(tokens):
+    client = FakeClient(ValueError("account 40140140 has an invalid token field"))
+
+    with pytest.raises(HTTPException):
+        sync_accounts(client)
+    assert tokens.refreshes == 0
+    assert client.calls == 1
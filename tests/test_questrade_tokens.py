@@ -0,0 +1,86 @@
+import asyncio
+import contextlib
+import time
+
+import pytest
+
+from app.brokers.questrade import tokens
+from app.brokers.questrade.tokens import QuestradeTokenHolder
+from app.errors import InvalidRefreshTokenError
+
+
+class MemoryStore:
+    def __init__(self, token=None):
+        self.token = token
+
+    async def read(self):
+        return self.token
+
+    async def compare_and_swap(self, expected, token):
+        if self.token != expected:
+            return False
+        self.token = token
+        return True
+
+    @contextlib.asynccontextmanager
+    async def lock(self):
+        yield
+
+
+class FakeClient:
+    """Accepts only the refresh token "valid"."""
+
+    def __init__(self, access_token=None, token_provider=None):
+        self.access_token = access_token
+
+    async def refresh_access_token(self):
+        if self.access_token["refresh_token"] != "valid":
+            raise InvalidRefreshTokenError()
+        self.access_token = {
+            "access_token": "new",
+            "refresh_token": "next",
+            "expires_at": int(time.time()) + 1800,
+        }
+        return self.access_token
+
+    @classmethod
+    async def from_refresh_token(cls, refresh_token):
+        client = cls(access_token={"refresh_token": refresh_token})
+        await client.refresh_access_token()
+        return client
+
+
+def holder(token):
+    holder = QuestradeTokenHolder(None, refresh_buffer_seconds=60, cache_seconds=30)
+    holder._store = MemoryStore(token)
+    return holder
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch):
+    monkeypatch.setattr(tokens, "QuestradeClient", FakeClient)
+
+
+def expired(refresh_token):
+    return {"access_token": "old", "refresh_token": refresh_token, "expires_at": 0}
+
+
+def test_rejected_refresh_token_raises():
+    holder_ = holder(expired("spent"))
+
+    with pytest.raises(InvalidRefreshTokenError):
+        asyncio.run(holder_.get_token())
+
+
+def test_missing_token_raises():
+    with pytest.raises(InvalidRefreshTokenError):
+        asyncio.run(holder(None).get_token())
+
+
+def test_set_refresh_token_replaces_the_stored_token():
+    holder_ = holder(expired("spent"))
+
+    asyncio.run(holder_.set_refresh_token("valid"))
+
+    assert holder_._store.token["refresh_token"] == "next"
+    assert asyncio.run(holder_.get_token())["access_token"] == "new"
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.utils.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """A monotonic clock that sleeping advances instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def acquire(clock, limits, times):
+    limiter = RateLimiter(limits, clock=clock, sleep=clock.sleep)
+
+    async def run():
+        for _ in range(times):
+            await limiter.acquire()
+
+    asyncio.run(run())
+
+
+def test_calls_within_the_limit_do_not_wait(clock):
+    acquire(clock, [(3, 1)], 3)
+
+    assert clock.sleeps == []
+
+
+def test_waits_for_the_window_to_free(clock):
+    acquire(clock, [(3, 1)], 4)
+
+    assert clock.sleeps == [1]
+    assert clock.now == 1
+
+
+def test_every_limit_applies(clock):
+    acquire(clock, [(2, 1), (3, 60)], 4)
+
+    # The third call waits out the per-second limit, the fourth the per-minute one.
+    assert clock.sleeps == [1, 59]
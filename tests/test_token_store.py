@@ -0,0 +1,35 @@
+import asyncio
+
+from app.brokers.questrade.token_store import FileTokenStore
+
+
+def test_file_lock_can_be_taken_repeatedly(tmp_path):
+    store = FileTokenStore(tmp_path / "token.yaml", lock_timeout=1)
+
+    async def take_lock_twice():
+        for _ in range(2):
+            async with store.lock():
+                pass
+
+    asyncio.run(take_lock_twice())
+    assert not store._file_lock.is_locked
+
+
+def test_file_lock_serializes_holders(tmp_path):
+    store = FileTokenStore(tmp_path / "token.yaml", lock_timeout=5)
+    events = []
+
+    async def hold(name):
+        async with store.lock():
+            events.append(f"{name} in")
+            await asyncio.sleep(0.05)
+            events.append(f"{name} out")
+
+    async def main():
+        await asyncio.gather(hold("a"), hold("b"))
+
+    asyncio.run(main())
+    assert events in (
+        ["a in", "a out", "b in", "b out"],
+        ["b in", "b out", "a in", "a out"],
+    )
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.wealthsimple_service import WealthsimpleService
+
+
+def feed_item(account_id, day):
+    return {
+        "canonicalId": f"{account_id}-{day}",
+        "accountId": account_id,
+        "occurredAt": f"2024-01-{day:02d}T12:00:00Z",
+    }
+
+
+class FakeAccountRepository:
+    def __init__(self, marks):
+        self.accounts = [
+            SimpleNamespace(account_number=account_id, last_activity_synced_at=mark)
+            for account_id, mark in marks.items()
+        ]
+        self.updates = {}
+
+    async def get_accounts_by_broker_name(self, db, broker_name):
+        return self.accounts
+
+    async def update_account(self, db, account_id, values):
+        self.updates[account_id] = values["last_activity_synced_at"]
+
+
+class FakeFeedService(WealthsimpleService):
+    """Serves each account's feed newest first, `page_size` items a page."""
+
+    def __init__(self, feeds, marks, page_size=2, fail_on_page=None):
+        self.account_repo = FakeAccountRepository(marks)
+        self.feeds = feeds
+        self.page_size = page_size
+        self.fail_on_page = fail_on_page
+        self.saved = []
+
+    def get_api(self, db, username):
+        return None
+
+    async def sync_accounts(self, db, api):
+        return list(self.feeds)
+
+    def fetch_activity_page(self, api, account_ids, cursor=None):
+        (account_id,) = account_ids
+        start = int(cursor or 0)
+        if start // self.page_size == self.fail_on_page:
+            raise RuntimeError("connection reset")
+        items = sorted(
+            self.feeds[account_id], key=lambda item: item["occurredAt"], reverse=True
+        )
+        page = items[start : start + self.page_size]
+        end = start + len(page)
+        return {
+            "edges": [{"node": item} for item in page],
+            "pageInfo": {"hasNextPage": end < len(items), "endCursor": str(end)},
+        }
+
+    async def save_feed_items(self, db, items, security_ids, counts):
+        self.saved.extend(item["canonicalId"] for item in items)
+
+
+def at(day):
+    return datetime(2024, 1, day, 12, tzinfo=timezone.utc)
+
+
+def test_new_account_gets_history_older_than_other_accounts():
+    feeds = {
+        "tfsa": [feed_item("tfsa", day) for day in (20, 21)],
+        "crypto": [feed_item("crypto", day) for day in (1, 2, 3)],
+    }
+    service = FakeFeedService(feeds, {"tfsa": at(20), "crypto": None})
+
+    asyncio.run(service.sync_activities(None, "user"))
+
+    assert {"crypto-1", "crypto-2", "crypto-3"} <= set(service.saved)
+    assert service.account_repo.updates == {"tfsa": at(21), "crypto": at(3)}
+
+
+def test_failed_run_keeps_the_mark_so_older_pages_are_refetched():
+    feeds = {"tfsa": [feed_item("tfsa", day) for day in range(1, 7)]}
+    service = FakeFeedService(feeds, {"tfsa": None}, fail_on_page=1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.sync_activities(None, "user"))
+    assert service.saved == ["tfsa-6", "tfsa-5"]
+    assert service.account_repo.updates == {}
+
+    service.fail_on_page = None
+    asyncio.run(service.sync_activities(None, "user"))
+    assert {f"tfsa-{day}" for day in range(1, 7)} <= set(service.saved)
+    assert service.account_repo.updates == {"tfsa": at(6)}
+
+
+def test_incremental_run_stops_at_the_account_mark():
+    feeds = {"tfsa": [feed_item("tfsa", day) for day in range(1, 7)]}
+    service = FakeFeedService(feeds, {"tfsa": at(4)})
+
+    counts = asyncio.run(service.sync_activities(None, "user"))
+
+    assert service.saved == ["tfsa-6", "tfsa-5", "tfsa-4"]
+    assert counts["page_count"] == 2
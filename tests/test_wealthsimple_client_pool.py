@@ -0,0 +1,58 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.brokers.wealthsimple.client_pool import WealthsimpleClientPool
+
+
+def client():
+    return SimpleNamespace(session=SimpleNamespace(access_token=None))
+
+
+def pool(max_size=2):
+    return WealthsimpleClientPool(max_size, default_ttl=600, expiry_buffer=60)
+
+
+def test_concurrent_misses_build_once():
+    pool_ = pool()
+    builds = []
+
+    def build():
+        builds.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return client()
+
+    threads = [
+        threading.Thread(target=pool_.get, args=("alice", build)) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert pool_._user_locks == {}
+
+
+def test_build_locks_do_not_outlive_evicted_clients():
+    pool_ = pool(max_size=2)
+
+    for i in range(10):
+        pool_.get(f"user-{i}", client)
+
+    assert list(pool_._clients) == ["user-8", "user-9"]
+    assert pool_._user_locks == {}
+
+
+def test_failed_build_releases_its_lock():
+    pool_ = pool()
+
+    def build():
+        raise RuntimeError("login failed")
+
+    try:
+        pool_.get("alice", build)
+    except RuntimeError:
+        pass
+
+    assert pool_._user_locks == {}
@@ -0,0 +1,42 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.brokers.wealthsimple.tokens import TokensBox
+from app.brokers.wealthsimple.wealthsimpleAPI import wealthsimpleAPI
+
+
+class FakeClient(wealthsimpleAPI):
+    """A client holding tokens that expire in `expires_in`, without logging in."""
+
+    def __init__(self, expires_in: timedelta):
+        self.box = TokensBox("access", "refresh", datetime.now() + expires_in)
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+
+    def refresh_token(self, tokens=None):
+        self.refreshes += 1
+        return TokensBox("new", "refresh", datetime.now() + timedelta(hours=1))
+
+    def _apply_tokens(self, box):
+        self.box = box
+
+
+def test_zero_buffer_waits_for_expiry():
+    client = FakeClient(expires_in=timedelta(minutes=5))
+
+    assert client.refresh_tokens_if_due(buffer=timedelta(0)) is False
+    assert client.refreshes == 0
+
+
+def test_default_buffer_refreshes_ahead_of_expiry():
+    client = FakeClient(expires_in=timedelta(minutes=5))
+
+    assert client.refresh_tokens_if_due() is True
+    assert client.refreshes == 1
+
+
+def test_zero_buffer_refreshes_an_expired_token():
+    client = FakeClient(expires_in=timedelta(seconds=-1))
+
+    assert client.refresh_tokens_if_due(buffer=timedelta(0)) is True
+    assert client.refreshes == 1